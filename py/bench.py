@@ -0,0 +1,228 @@
+"""
+benchmarks each solution against generated inputs of increasing size.
+
+inputs come from generate.py, and are timed with the same library entry points
+as run.py. results are saved as json, and any saved results can be used as a
+baseline to check a later run for regressions. run it from the root of the
+project like so:
+
+$ python py/bench.py --day 8 --repeat 10 --output baseline.json
+$ python py/bench.py --compare baseline.json --threshold 0.1
+"""
+import argparse
+import dataclasses
+import json
+import math
+import statistics
+import sys
+import tempfile
+from typing import Any
+
+import generate
+import run
+
+# sizes to benchmark each day at by default. these are picked so that the
+# largest size takes a while without taking forever, which varies a lot!
+DEFAULT_SCALES: dict[int, list[int]] = {
+    1: [1000, 10000, 100000],
+    2: [1000, 10000, 100000],
+    3: [1000, 10000, 100000],
+    4: [1000, 10000, 100000],
+    5: [100, 1000, 10000],
+    6: [1000, 10000, 100000],
+    7: [100, 1000, 10000],
+    8: [10, 30, 100],
+    9: [100, 1000, 10000],
+    10: [240],
+    11: [4, 8, 16],
+    12: [14, 30, 60],
+    13: [100, 1000, 10000],
+    14: [10, 30, 100],
+    # part 2 always scans 4,000,000 rows, so even the smallest size is slow.
+    15: [4, 16, 64],
+    16: [10, 20, 30],
+}
+
+# peak memory differences smaller than this are ignored when comparing, since
+# tiny phases can wobble by a few allocations between runs.
+MEMORY_NOISE = 4096
+
+
+def bench_day(day: int, scale: int, *, repeat: int, seed: int) -> dict[str, Any]:
+    """generate an input for the day at the given scale and time the solution."""
+    with tempfile.TemporaryDirectory() as inputs_dir:
+        generate.write_inputs(inputs_dir, scale=scale, days=[day], seed=seed)
+        result = run.run_day(day, repeat=repeat, inputs_dir=inputs_dir)
+        usage = run.measure_memory(day, inputs_dir=inputs_dir)
+
+    return {
+        "day": day,
+        "scale": scale,
+        "answers": result.answers,
+        "phases": {
+            phase: {
+                "wall": dataclasses.asdict(result.wall(phase)),
+                "cpu": dataclasses.asdict(result.cpu(phase)),
+                "samples": [sample.wall for sample in result.samples[phase]],
+                "peak_memory": usage[phase].peak,
+            }
+            for phase in run.PHASES
+        },
+    }
+
+
+def slower_p_value(before: list[float], after: list[float]) -> float:
+    """
+    one-sided mann-whitney u test; the probability of seeing timings at least
+    this much slower in `after` if it were really no slower than `before`.
+
+    it only looks at the order of the samples, so it isn't thrown off by the
+    occasional huge outlier like a t-test would be. uses the normal
+    approximation, which is reasonable from around 8 samples each.
+    """
+    n_before, n_after = len(before), len(after)
+    combined = sorted((value, i < n_before) for i, value in enumerate(before + after))
+
+    # rank the samples, giving tied values the average of their ranks.
+    ranks: dict[float, float] = {}
+    i = 0
+    while i < len(combined):
+        j = i
+        while j < len(combined) and combined[j][0] == combined[i][0]:
+            j += 1
+        ranks[combined[i][0]] = (i + j + 1) / 2
+        i = j
+
+    rank_sum = sum(ranks[value] for value in after)
+    u_stat = rank_sum - n_after * (n_after + 1) / 2
+    mean = n_before * n_after / 2
+    deviation = math.sqrt(n_before * n_after * (n_before + n_after + 1) / 12)
+    if deviation == 0:
+        return 1.0
+
+    z_score = (u_stat - mean) / deviation
+    return 0.5 * math.erfc(z_score / math.sqrt(2))
+
+
+def compare(
+    baseline: dict[str, Any], *, threshold: float, alpha: float
+) -> list[str]:
+    """
+    re-run every benchmark in the baseline, print a comparison, and return a
+    description of each regression found.
+
+    a phase has regressed if its median time grew by more than `threshold`
+    (as a fraction) and the slowdown is significant at `alpha`, or if its peak
+    memory grew by more than `threshold` (and more than `MEMORY_NOISE`).
+    """
+    regressions = []
+    print(
+        f"{'day':>3} {'scale':>7} {'phase':<6}"
+        f"{'before':>12}{'after':>12}{'change':>9}{'p':>8}"
+        f"{'peak before':>14}{'peak after':>14}"
+    )
+    for old in baseline["results"]:
+        new = bench_day(
+            old["day"], old["scale"], repeat=baseline["repeat"], seed=baseline["seed"]
+        )
+        for phase in run.PHASES:
+            before = old["phases"][phase]
+            after = new["phases"][phase]
+
+            old_median = statistics.median(before["samples"])
+            new_median = statistics.median(after["samples"])
+            change = new_median / old_median - 1 if old_median else 0.0
+            p_value = slower_p_value(before["samples"], after["samples"])
+
+            flags = []
+            if change > threshold and p_value < alpha:
+                flags.append("SLOWER")
+            extra_memory = after["peak_memory"] - before["peak_memory"]
+            if extra_memory > max(before["peak_memory"] * threshold, MEMORY_NOISE):
+                flags.append("MORE MEMORY")
+
+            line = (
+                f"{old['day']:>3} {old['scale']:>7} {phase:<6}"
+                f"{run.format_seconds(old_median)}{run.format_seconds(new_median)}"
+                f"{change:>+9.1%}{p_value:>8.3f}"
+                f"{before['peak_memory']:>14,}{after['peak_memory']:>14,}"
+                f"  {' '.join(flags)}"
+            )
+            print(line.rstrip())
+            if flags:
+                regressions.append(
+                    f"day {old['day']} @ {old['scale']} {phase}: {', '.join(flags)}"
+                )
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--day",
+        type=int,
+        action="append",
+        choices=run.DAYS,
+        help="day to benchmark. can be given more than once. defaults to every day.",
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        nargs="+",
+        help="sizes to benchmark at, overriding the defaults for every day.",
+    )
+    parser.add_argument("--repeat", type=run.positive, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench.json")
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="re-run the benchmarks in this file and report any regressions.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="how much slower (as a fraction) a phase can get before it's flagged.",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="significance level a slowdown has to reach to be flagged.",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = compare(baseline, threshold=args.threshold, alpha=args.alpha)
+        if regressions:
+            print()
+            print("\n".join(regressions))
+            sys.exit(1)
+        return
+
+    results = []
+    for day in args.day or run.DAYS:
+        for scale in args.scale or DEFAULT_SCALES[day]:
+            print(f"day {day} @ {scale}...", end=" ", flush=True)
+            results.append(bench_day(day, scale, repeat=args.repeat, seed=args.seed))
+            total = sum(
+                phase["wall"]["median"] for phase in results[-1]["phases"].values()
+            )
+            print(run.format_seconds(total).strip())
+
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(
+            {"repeat": args.repeat, "seed": args.seed, "results": results},
+            output_file,
+            indent=2,
+            default=str,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+an on-disk cache of parsed inputs, so repeated runs can skip parsing entirely.
+
+entries are pickled parse results, keyed by a hash of the input data and of the
+source code that parsed it. editing a day (or anything local it imports, like
+parsing.py) changes the key, so stale entries are never loaded; they just age
+out of the cache, which evicts the least recently used entries once it grows
+past its size limit.
+"""
+import hashlib
+import os
+import pickle
+import sys
+from types import ModuleType
+from typing import Any
+
+from reader import Buffer
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def source_files(module: ModuleType) -> list[str]:
+    """
+    returns the source file of the module, plus those of any modules it
+    imports from alongside it.
+    """
+    here = os.path.dirname(os.path.abspath(module.__file__ or ""))
+    files = {os.path.abspath(module.__file__ or "")}
+    for value in vars(module).values():
+        if isinstance(value, ModuleType):
+            name = value.__name__
+        else:
+            name = getattr(value, "__module__", None)
+
+        dependency = sys.modules.get(name) if isinstance(name, str) else None
+        path = getattr(dependency, "__file__", None)
+        if path and os.path.dirname(os.path.abspath(path)) == here:
+            files.add(os.path.abspath(path))
+    return sorted(files)
+
+
+class ParseCache:
+    """stores & loads parse results for day modules in a directory."""
+
+    def __init__(self, directory: str, *, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.versions: dict[str, str] = {}
+
+    def version(self, module: ModuleType) -> str:
+        """a hash of all the source code that goes into parsing for `module`."""
+        if module.__name__ not in self.versions:
+            digest = hashlib.sha256()
+            for path in source_files(module):
+                with open(path, "rb") as source_file:
+                    digest.update(source_file.read())
+            self.versions[module.__name__] = digest.hexdigest()
+        return self.versions[module.__name__]
+
+    def path(self, module: ModuleType, data: Buffer) -> str:
+        digest = hashlib.sha256(self.version(module).encode())
+        digest.update(data)
+        return os.path.join(
+            self.directory, f"{module.__name__}-{digest.hexdigest()[:32]}.pickle"
+        )
+
+    def parse(self, module: ModuleType, data: Buffer) -> Any:
+        """
+        returns `module.parse(data)`, loading it from the cache if possible
+        and storing it there otherwise.
+        """
+        path = self.path(module, data)
+        try:
+            with open(path, "rb") as cache_file:
+                parsed = pickle.load(cache_file)
+        except FileNotFoundError:
+            pass
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # a corrupt or unloadable entry is just a miss; it'll be replaced.
+            pass
+        else:
+            # touch the entry so eviction knows it was used recently. another
+            # process sharing the cache may have just evicted it, which is fine:
+            # it's already loaded.
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            return parsed
+
+        parsed = module.parse(data)
+        self.store(path, parsed)
+        return parsed
+
+    def store(self, path: str, parsed: Any) -> None:
+        """write an entry, then evict old ones if the cache is over its limit."""
+        os.makedirs(self.directory, exist_ok=True)
+
+        # write to a temporary file first so readers never see half an entry.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as cache_file:
+            pickle.dump(parsed, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+        self.evict(keep=path)
+
+    def evict(self, *, keep: str) -> None:
+        """
+        delete least recently used entries until the cache fits its limit.
+
+        several processes can share a cache, so entries may disappear while
+        this runs; those are already evicted, as far as this is concerned.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pickle"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,214 @@
+"""
+day 1: calorie counting
+
+there are a few ways to add up each elf's calories, suited to different sizes of
+input. they all give the same totals:
+
+- bulk: read the whole file and split it into lines all at once. fast, but the
+  whole file has to fit in memory.
+- stream: read the file a line at a time, only ever holding one elf's total.
+- mmap: the same as stream, but walking a memory-mapped copy of the file, which
+  skips the copy into python's file buffers.
+- parallel: split the mapped file into a byte range per process, and total the
+  groups in each range at the same time. for files far bigger than memory.
+
+the top `k` totals are kept in a heap as they go by, so picking them is
+O(n log k) rather than sorting every total.
+"""
+import argparse
+import heapq
+import itertools
+import os
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+from reader import Buffer, open_input
+
+
+def line_totals(numbers: Iterable[bytes]) -> Iterator[int]:
+    """
+    yields the total of each group of lines, where groups are separated by
+    blank lines. the last group counts even without a blank line after it.
+    """
+    total = 0
+    in_group = False
+    for line in numbers:
+        if line.strip():
+            total += int(line)
+            in_group = True
+        elif in_group:
+            yield total
+            total = 0
+            in_group = False
+
+    if in_group:
+        yield total
+
+
+def bulk(path: str) -> Iterator[int]:
+    with open(path, "rb") as inputs_file:
+        data = inputs_file.read()
+    return line_totals(data.splitlines())
+
+
+def stream(path: str) -> Iterator[int]:
+    with open(path, "rb") as inputs_file:
+        yield from line_totals(inputs_file)
+
+
+def mapped(path: str) -> Iterator[int]:
+    with open_input(path) as data:
+        if data:
+            # the map's own readline finds line endings in c, which is a lot
+            # quicker than `reader.lines`.
+            yield from line_totals(iter(data.readline, b""))
+
+
+STRATEGIES: dict[str, Callable[[str], Iterator[int]]] = {
+    "bulk": bulk,
+    "stream": stream,
+    "mmap": mapped,
+}
+
+
+def top(totals: Iterable[int], k: int) -> list[int]:
+    """the `k` largest totals, largest first."""
+    return heapq.nlargest(k, totals)
+
+
+class Chunk(NamedTuple):
+    """
+    the groups found in one byte range of the file.
+
+    the first & last groups in a range may carry on into its neighbours, so
+    they're kept apart as (total, lines) pairs, to be stitched together with
+    the pieces on the other side. `tail` is `None` when there's no blank line
+    in the range at all, so `head` is all of it. only the largest `k` of the
+    groups wholly inside the range are kept.
+    """
+
+    head: tuple[int, int]
+    largest: list[int]
+    tail: tuple[int, int] | None
+
+
+def chunk_ranges(path: str, count: int) -> list[tuple[int, int]]:
+    """split the file into `count` byte ranges of about the same size."""
+    with open_input(path) as data:
+        size = len(data)
+        bounds = [0]
+        for index in range(1, count):
+            # move each boundary on to the start of the next line.
+            newline = data.find(b"\n", max(size * index // count - 1, bounds[-1]))
+            bounds.append(size if newline == -1 else newline + 1)
+        bounds.append(size)
+    return list(itertools.pairwise(bounds))
+
+
+def sum_range(path: str, start: int, end: int, k: int) -> Chunk:
+    """total the groups in a byte range of the file, which starts on a line."""
+    head = None
+    largest: list[int] = []
+    total = lines = 0
+    with open_input(path) as data:
+        if data:
+            data.seek(start)
+        while data and data.tell() < end:
+            line = data.readline()
+            if line.strip():
+                total += int(line)
+                lines += 1
+                continue
+
+            if head is None:
+                head = (total, lines)
+            elif lines and len(largest) < k:
+                heapq.heappush(largest, total)
+            elif lines:
+                heapq.heappushpop(largest, total)
+            total = lines = 0
+
+    if head is None:
+        return Chunk(head=(total, lines), largest=[], tail=None)
+    return Chunk(head=head, largest=largest, tail=(total, lines))
+
+
+def parallel(path: str, *, k: int, jobs: int = 0) -> list[int]:
+    """
+    the `k` largest totals in the file at `path`, found by totalling a range
+    of it per process. `jobs` is the number of processes, or 0 for one per cpu.
+    """
+    # only imported here, as it pulls in most of multiprocessing, which would
+    # slow down starting up for every other strategy.
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = jobs or os.cpu_count() or 1
+    starts, ends = zip(*chunk_ranges(path, jobs))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        chunks = pool.map(
+            sum_range, itertools.repeat(path), starts, ends, itertools.repeat(k)
+        )
+
+        # stitch the groups that cross from one range into the next.
+        totals = []
+        carry_total = carry_lines = 0
+        for chunk in chunks:
+            carry_total += chunk.head[0]
+            carry_lines += chunk.head[1]
+            if chunk.tail is None:
+                continue
+            if carry_lines:
+                totals.append(carry_total)
+            totals.extend(chunk.largest)
+            carry_total, carry_lines = chunk.tail
+
+    if carry_lines:
+        totals.append(carry_total)
+    return top(totals, k)
+
+
+def solve(path: str, *, strategy: str = "bulk", k: int = 3, jobs: int = 0) -> list[int]:
+    """
+    the `k` largest totals in the file at `path`, largest first. `jobs` is only
+    used by the parallel strategy.
+    """
+    if strategy == "parallel":
+        return parallel(path, k=k, jobs=jobs)
+    return top(STRATEGIES[strategy](path), k)
+
+
+def parse(data: Buffer) -> list[int]:
+    """returns the total calories carried by each elf."""
+    return list(line_totals(data[:].splitlines()))
+
+
+def part1(totals: list[int]) -> int:
+    return max(totals, default=0)
+
+
+def part2(totals: list[int]) -> int:
+    return sum(top(totals, 3))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--input", default="inputs/day1")
+    parser.add_argument("--strategy", choices=[*STRATEGIES, "parallel"], default="bulk")
+    parser.add_argument("-k", type=int, default=3, help="how many elves to sum")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="processes for the parallel strategy; 0 means one per cpu.",
+    )
+    args = parser.parse_args()
+    if args.k < 1:
+        parser.error(f"-k must be at least 1, not {args.k}")
+
+    largest = solve(args.input, strategy=args.strategy, k=args.k, jobs=args.jobs)
+    # an empty input has no elves, who carry nothing between them.
+    print(f"part 1: {max(largest, default=0)}")
+    print(f"part 2: {sum(largest)}")
+
+
+if __name__ == "__main__":
+    main()
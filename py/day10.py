@@ -1,15 +1,8 @@
 """day 10: cathode-ray tube"""
 from dataclasses import dataclass
-from typing import Callable, Generator
+from typing import Callable
 
-InputLines = Generator[str, None, None]
-
-
-def input_lines() -> InputLines:
-    """yield lines from the inputs file."""
-    with open("inputs/day10", encoding="utf-8") as inputs_file:
-        lines = (line.strip() for line in inputs_file)
-        yield from lines
+from reader import Buffer, open_input, text_lines
 
 
 class Machine:
@@ -86,7 +79,12 @@ class EmulationResult:
     render_lines: list[list[str]]
 
 
-def run() -> EmulationResult:
+def parse(data: Buffer) -> list[str]:
+    """returns each instruction in the program."""
+    return [line.strip() for line in text_lines(data)]
+
+
+def run(program: list[str]) -> EmulationResult:
     """run the emulation and return the results."""
     result = EmulationResult(signal_strength=0, render_lines=[[] for _ in range(6)])
 
@@ -98,20 +96,32 @@ def run() -> EmulationResult:
         result.render_lines[machine.crt_row].append(sym)
 
     machine = Machine(hsync_probe, step_probe)
-    for line in input_lines():
+    for line in program:
         machine.dispatch(line)
 
     return result
 
 
+def part1(program: list[str]) -> int:
+    """the signal strength after running the program."""
+    return run(program).signal_strength
+
+
+def part2(program: list[str]) -> str:
+    """the image drawn on the crt by the program."""
+    return "\n".join(["".join(line) for line in run(program).render_lines])
+
+
 def solve() -> None:
     """
     run the emulation and print the results for parts 1 and 2 of the puzzle.
     """
-    result = run()
-    print(f"part 1: {result.signal_strength}")
+    with open_input("inputs/day10") as data:
+        program = parse(data)
+
+    print(f"part 1: {part1(program)}")
     print("part 2:")
-    print("\n".join(["".join(line) for line in result.render_lines]))
+    print(part2(program))
 
 
 if __name__ == "__main__":
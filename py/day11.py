@@ -1,24 +1,32 @@
 import math
 from dataclasses import dataclass
 from enum import Enum, auto
+from typing import Iterable, Iterator, Sequence, TypeVar
+
+try:
+    from typing import assert_never
+except ImportError:  # python < 3.11
+    from typing_extensions import assert_never
 
 from parsing import (
-    Parse,
-    ParseError,
     Parser,
+    Stream,
+    alternative,
+    compiled,
     delimited,
     exact,
     integer,
+    integers,
+    mapped,
     one_of,
-    separated,
+    optional,
+    parse_stream,
+    sequence,
     whitespace,
 )
-from typing_extensions import assert_never
-
+from reader import Buffer, open_input, text_chunks
 
-def load_inputs() -> str:
-    with open("inputs/day11", encoding="utf-8") as inputs_file:
-        return inputs_file.read()
+T = TypeVar("T")
 
 
 @dataclass(frozen=True)
@@ -75,16 +83,10 @@ class Operation:
 
 
 def operand() -> Parser[Operand]:
-    def parser(stream: str) -> Parse[Operand]:
-        try:
-            _, stream = exact("old")(stream)
-        except ParseError:
-            value, stream = integer()(stream)
-            return OperandValue(value), stream
-        else:
-            return OperandOld(), stream
-
-    return parser
+    return alternative(
+        mapped(exact("old"), lambda _: OperandOld()),
+        mapped(integer(), OperandValue),
+    )
 
 
 def operator() -> Parser[Operator]:
@@ -94,100 +96,97 @@ def operator() -> Parser[Operator]:
         "*": Operator.MUL,
         "/": Operator.DIV,
     }
-
-    def parser(stream: str) -> Parse[Operator]:
-        op, stream = one_of("+-*/")(stream)
-        return char_to_operator[op], stream
-
-    return parser
+    return mapped(one_of("+-*/"), char_to_operator.__getitem__)
 
 
 def operation() -> Parser[Operation]:
-    def parser(stream: str) -> Parse[Operation]:
-        left, stream = operand()(stream)
-        _, stream = whitespace(1)(stream)
-        op, stream = operator()(stream)
-        _, stream = whitespace(1)(stream)
-        right, stream = operand()(stream)
-        return Operation(operator=op, left=left, right=right), stream
+    def build(values: tuple) -> Operation:
+        left, _, op, _, right = values
+        return Operation(operator=op, left=left, right=right)
 
-    return parser
+    return mapped(
+        sequence(operand(), whitespace(1), operator(), whitespace(1), operand()),
+        build,
+    )
 
 
 @dataclass(frozen=True)
 class Rule:
     monkey_num: int
-    initial_items: list[int]
+    initial_items: tuple[int, ...]
     operation: Operation
     modulo_test: int
     if_true: int
     if_false: int
 
 
-def parse_rule(stream: str) -> Parse[Rule]:
-    # Monkey 0:
-    monkey_num, stream = delimited(exact("Monkey "), integer(), exact(":\n"))(stream)
-
-    #   Starting items: 79, 98
-    items, stream = delimited(
-        exact("  Starting items: "), separated(integer(), ", "), exact("\n")
-    )(stream)
-
-    #   Operation: new = old * 19
-    #   Operation: new = old + 6
-    #   Operation: new = old * old
-    oper, stream = delimited(exact("  Operation: new = "), operation(), exact("\n"))(
-        stream
+def line(prefix: str, inner: Parser[T], suffix: str = "\n") -> Parser[T]:
+    return delimited(exact(prefix), inner, exact(suffix))
+
+
+def rule() -> Parser[Rule]:
+    def build(values: tuple) -> Rule:
+        monkey_num, items, oper, modulo, if_true, if_false, _ = values
+        return Rule(
+            monkey_num=monkey_num,
+            initial_items=tuple(items),
+            operation=oper,
+            modulo_test=modulo,
+            if_true=if_true,
+            if_false=if_false,
+        )
+
+    return mapped(
+        sequence(
+            # Monkey 0:
+            line("Monkey ", integer(), ":\n"),
+            #   Starting items: 79, 98
+            line("  Starting items: ", integers(", ")),
+            #   Operation: new = old * 19
+            #   Operation: new = old + 6
+            #   Operation: new = old * old
+            line("  Operation: new = ", operation()),
+            #   Test: divisible by 13
+            line("  Test: divisible by ", integer()),
+            #     If true: throw to monkey 2
+            line("    If true: throw to monkey ", integer()),
+            #     If false: throw to monkey 3
+            line("    If false: throw to monkey ", integer()),
+            # a blank line between rules, but not after the last one
+            optional(exact("\n")),
+        ),
+        build,
     )
 
-    #   Test: divisible by 13
-    modulo, stream = delimited(exact("  Test: divisible by "), integer(), exact("\n"))(
-        stream
-    )
 
-    #     If true: throw to monkey 2
-    if_true, stream = delimited(
-        exact("    If true: throw to monkey "), integer(), exact("\n")
-    )(stream)
-
-    #     If false: throw to monkey 3
-    if_false, stream = delimited(
-        exact("    If false: throw to monkey "), integer(), exact("\n")
-    )(stream)
-
-    try:
-        _, stream = exact("\n")(stream)
-    except ParseError:
-        pass  # we're at the end
-
-    rule = Rule(
-        monkey_num=monkey_num,
-        initial_items=items,
-        operation=oper,
-        modulo_test=modulo,
-        if_true=if_true,
-        if_false=if_false,
-    )
-    return rule, stream
+def iter_rules(chunks: Iterable[Stream]) -> Iterator[Rule]:
+    """
+    yields each rule as soon as it has been read from `chunks`, for inputs too
+    big to read at once. rules are separated by a blank line.
+    """
+    return parse_stream(compiled(rule()), chunks, "\n\n")
+
 
+def parse_rules(stream: Stream) -> tuple[Rule, ...]:
+    # the whole rule grammar is regular, so it compiles to one regex.
+    parse_rule = compiled(rule())
 
-def parse_rules() -> list[Rule]:
-    stream = load_inputs()
     rules = []
-    while stream:
-        rule, stream = parse_rule(stream)
-        rules.append(rule)
-    return rules
+    position = 0
+    while position < len(stream):
+        parsed, position = parse_rule(stream, position)
+        rules.append(parsed)
+    return tuple(rules)
 
 
-def create_monkeys(rules: list[Rule]) -> list[list[int]]:
+def create_monkeys(rules: Sequence[Rule]) -> list[list[int]]:
     monkeys: list[list[int]] = [[] for _ in rules]
     for rule in rules:
         monkeys[rule.monkey_num].extend(rule.initial_items)
     return monkeys
 
 
-def run_rounds(rounds: int, *, rules: list[Rule], relief: bool = True) -> int:
+def run_rounds(rounds: int, *, rules: Sequence[Rule], relief: bool = True) -> int:
     monkeys = create_monkeys(rules)
     inspections = [0 for _ in rules]
 
@@ -220,10 +219,26 @@ def run_rounds(rounds: int, *, rules: list[Rule], relief: bool = True) -> int:
     return monkey_business
 
 
-rules = parse_rules()
+def parse(data: Buffer) -> tuple[Rule, ...]:
+    # decoding a chunk at a time means the whole file is never held as text.
+    return tuple(iter_rules(text_chunks(data)))
+
+
+def part1(rules: Sequence[Rule]) -> int:
+    return run_rounds(20, rules=rules)
+
+
+def part2(rules: Sequence[Rule]) -> int:
+    return run_rounds(10000, rules=rules, relief=False)
+
+
+def main() -> None:
+    with open_input("inputs/day11") as data:
+        rules = parse(data)
+
+    print(f"part 1: {part1(rules)}")
+    print(f"part 2: {part2(rules)}")
 
-part_1 = run_rounds(20, rules=rules)
-print(f"part 1: {part_1}")
 
-part_2 = run_rounds(10000, rules=rules, relief=False)
-print(f"part 2: {part_2}")
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 from dataclasses import dataclass
 from typing import Generator, cast
 
+from reader import Buffer, open_input, text_lines
+
 Coord = tuple[int, int]
 
 
@@ -44,13 +46,12 @@ def all_neighbours(pos: Coord) -> list[Coord]:
     ]
 
 
-def read_graph() -> Graph:
+def parse(data: Buffer) -> Graph:
     """
-    read the input and parse it into a dictionary mapping coordinates to
-    attainable adjacent coordinates.
+    parse the input into a dictionary mapping coordinates to attainable
+    adjacent coordinates.
     """
-    with open("inputs/day12", encoding="utf-8") as inputs_file:
-        lines = [line.strip() for line in inputs_file]
+    lines = [line.strip() for line in text_lines(data)]
 
     def char_at(pos: Coord) -> str:
         return lines[pos[0]][pos[1]]
@@ -129,19 +130,35 @@ def all_routes(graph: Graph) -> Generator[list[Coord], None, None]:
             yield route
 
 
-def solve(all_starts: bool) -> int:
+def solve(graph: Graph, all_starts: bool) -> int:
     """
     solve the puzzle and return the answer.
     `all_starts` controls whether to use the indicated start or all possible
     starts, aka part 1 and part 2 of the puzzle.
     """
-    graph = read_graph()
     if all_starts:
         return min(len(route) for route in all_routes(graph)) - 1
     return len(cast(Coord, bfs(graph, graph.start))) - 1
 
 
-part_1 = solve(False)
-print(f"part 1: {part_1}")
-part_2 = solve(True)
-print(f"part 2: {part_2}")
+def part1(graph: Graph) -> int:
+    """fewest steps from the indicated start to the target."""
+    return solve(graph, False)
+
+
+def part2(graph: Graph) -> int:
+    """fewest steps from any lowest point to the target."""
+    return solve(graph, True)
+
+
+def main() -> None:
+    """solve both parts of the puzzle with the input file."""
+    with open_input("inputs/day12") as data:
+        graph = parse(data)
+
+    print(f"part 1: {part1(graph)}")
+    print(f"part 2: {part2(graph)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,14 @@
 from functools import cmp_to_key
 from typing import Generator
 
-PacketList = list[tuple[list[int], list[int]]]
+from reader import Buffer, blocks, open_input
 
+PacketList = list[tuple[list[int], list[int]]]
 
-def read_inputs() -> PacketList:
-    with open("inputs/day13", encoding="utf-8") as inputs_file:
-        pairs = inputs_file.read().strip().split("\n\n")
 
-    def iter_pairs() -> Generator[tuple[str, str], None, None]:
-        yield from (tuple(pair.split()) for pair in pairs)
+def parse(data: Buffer) -> PacketList:
+    def iter_pairs() -> Generator[tuple[bytes, bytes], None, None]:
+        yield from (tuple(pair.split()) for pair in blocks(data))
 
     return [(eval(left), eval(right)) for left, right in iter_pairs()]
 
@@ -71,20 +70,27 @@ def reorder(packets: PacketList) -> list[list[int]]:
     return sorted(all_packets, key=key, reverse=True)
 
 
-def main():
-    packets = read_inputs()
-
-    part_1 = sum(
+def part1(packets: PacketList) -> int:
+    return sum(
         i
         for i, (left, right) in enumerate(packets, start=1)
         if all_in_order(left, right)
     )
-    print(f"part 1: {part_1}")
 
+
+def part2(packets: PacketList) -> int:
     sorted_packets = reorder(packets)
     div_1 = sorted_packets.index([[2]]) + 1
     div_2 = sorted_packets.index([[6]]) + 1
-    print(f"part 2: {div_1 * div_2}")
+    return div_1 * div_2
+
+
+def main():
+    with open_input("inputs/day13") as data:
+        packets = parse(data)
+
+    print(f"part 1: {part1(packets)}")
+    print(f"part 2: {part2(packets)}")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
 import itertools
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Generator
+from typing import Generator, Sequence
+
+from reader import Buffer, open_input, text_lines
 
 
 @dataclass(frozen=True)
@@ -22,7 +24,7 @@ class Element(Enum):
 
 SOURCE = Vec2(500, 0)
 
-Path = list[Vec2]
+Path = tuple[Vec2, ...]
 Space = list[list[Element]]
 
 
@@ -57,13 +59,12 @@ def between(a: Vec2, b: Vec2) -> Generator[Vec2, None, None]:
         yield Vec2(x, y)
 
 
-def yield_paths() -> Generator[Path, None, None]:
-    with open("inputs/day14", encoding="utf-8") as inputs_file:
-        lines = (line.strip() for line in inputs_file)
-        yield from (list(line_to_points(line)) for line in lines)
+def parse(data: Buffer) -> tuple[Path, ...]:
+    lines = (line.strip() for line in text_lines(data))
+    return tuple(tuple(line_to_points(line)) for line in lines)
 
 
-def find_extents(paths: list[Path]) -> tuple[Vec2, Vec2]:
+def find_extents(paths: Sequence[Path]) -> tuple[Vec2, Vec2]:
     points = [point for path in paths for point in path]
     points.append(SOURCE)
 
@@ -92,7 +93,7 @@ def print_space(space: Space, minv: Vec2, maxv: Vec2) -> None:
     print()
 
 
-def draw_rocks(space: Space, paths: list[Path], origin: Vec2) -> None:
+def draw_rocks(space: Space, paths: Sequence[Path], origin: Vec2) -> None:
     for path in paths:
         for a, b in zip(path, path[1:]):
             for point in between(a, b):
@@ -156,8 +157,7 @@ def new_space(minv: Vec2, maxv: Vec2):
     ]
 
 
-def part1() -> None:
-    paths = list(yield_paths())
+def part1(paths: Sequence[Path]) -> int:
     minv, maxv = find_extents(paths)
     space = new_space(minv, maxv)
     draw_rocks(space, paths, minv)
@@ -170,19 +170,19 @@ def part1() -> None:
     # this needs a large space to print correctly!
     # print_space(space, minv, maxv)
 
-    print(f"part 1: {part_1}")
+    return part_1
 
 
-def part2() -> None:
-    paths = list(yield_paths())
+def part2(paths: Sequence[Path]) -> int:
     minv, maxv = find_extents(paths)
 
     # sand stacks at 45 degrees, so at most we will need a floor twice as wide as the space is high.
     # add 2 since the floor is meant to be 2 below the lowest point in the paths
     height = maxv.y - minv.y + 2
-    paths.append(
-        [Vec2(SOURCE.x - height, maxv.y + 2), Vec2(SOURCE.x + height, maxv.y + 2)]
-    )
+    paths = [
+        *paths,
+        (Vec2(SOURCE.x - height, maxv.y + 2), Vec2(SOURCE.x + height, maxv.y + 2)),
+    ]
 
     # recalculate bounds with floor in place
     minv, maxv = find_extents(paths)
@@ -197,12 +197,15 @@ def part2() -> None:
     # set your font size to around 3-4px for any chance of seeing this properly.
     # print_space(space, minv, maxv)
 
-    print(f"part 2: {part_2}")
+    return part_2
 
 
 def main():
-    part1()
-    part2()
+    with open_input("inputs/day14") as data:
+        paths = parse(data)
+
+    print(f"part 1: {part1(paths)}")
+    print(f"part 2: {part2(paths)}")
 
 
 if __name__ == "__main__":
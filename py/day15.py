@@ -1,9 +1,12 @@
 import re
 from dataclasses import dataclass
 from operator import itemgetter
-from typing import Generator, Sequence
+from typing import Sequence
 
-from prettyprinter import cpprint
+from reader import Buffer, open_input, text_lines
+
+P1_ROW = 2000000
+P2_MAX_SIZE = 4000000
 
 line_re = re.compile(
     r"^Sensor at x=(-?\d+), y=(-?\d+): closest beacon is at x=(-?\d+), y=(-?\d+)$"
@@ -45,11 +48,9 @@ def parse_line(line: str) -> Sensor:
     )
 
 
-def read_inputs(test: bool = False) -> Generator[Sensor, None, None]:
-    filename = "inputs/day15-test" if test else "inputs/day15"
-    with open(filename, encoding="utf-8") as inputs_file:
-        lines = (line.strip() for line in inputs_file)
-        yield from (parse_line(line) for line in lines)
+def parse(data: Buffer) -> list[Sensor]:
+    lines = (line.strip() for line in text_lines(data))
+    return [parse_line(line) for line in lines]
 
 
 def get_bounds(sensors: Sequence[Sensor]) -> tuple[Coord, Coord]:
@@ -120,18 +121,32 @@ def clamp(value: int, minv: int, maxv: int) -> int:
     return value
 
 
-def find_uncovered_square(sensors: Sequence[Sensor], *, max_size: int) -> Coord:
+def find_uncovered_square(
+    sensors: Sequence[Sensor], *, max_size: int, verbose: bool = False
+) -> Coord:
+    """
+    scan every row for the one with a gap in it.
+    `verbose` shows progress & the segments of the uncovered row as it goes.
+    """
     minv, maxv = get_bounds(sensors)
     minv = (clamp(minv[0], 0, max_size), clamp(minv[1], 0, max_size))
     maxv = (clamp(maxv[0], 0, max_size), clamp(maxv[1], 0, max_size))
     for row in range(max_size + 1):
-        print(f"{row} / {max_size} ({int(100 * row / max_size)}%)", end="\r")
+        if verbose:
+            print(f"{row} / {max_size} ({int(100 * row / max_size)}%)", end="\r")
         segments = get_segments(row, sensors, minv, maxv)
         if len(segments) == 1:
             continue
 
-        print()
-        cpprint(segments)
+        if verbose:
+            # only needed for debugging, so don't pay for importing it otherwise.
+            try:
+                from prettyprinter import cpprint
+            except ImportError:
+                from pprint import pprint as cpprint
+
+            print()
+            cpprint(segments)
         start, end = segments
         mid = (start[1] + end[0]) // 2
         return (mid, row)
@@ -143,21 +158,29 @@ def tuning_freq(coord: Coord, *, max_size: int) -> int:
     return coord[0] * max_size + coord[1]
 
 
+def part1(sensors: Sequence[Sensor], *, row: int = P1_ROW) -> int:
+    return count_covered_squares(sensors, row=row)
+
+
+def part2(
+    sensors: Sequence[Sensor], *, max_size: int = P2_MAX_SIZE, verbose: bool = False
+) -> int:
+    return tuning_freq(
+        find_uncovered_square(sensors, max_size=max_size, verbose=verbose),
+        max_size=P2_MAX_SIZE,
+    )
+
+
 def main():
     TEST = False
-    P1_ROW = 10 if TEST else 2000000
-    P2_NORMAL_MAX_SIZE = 4000000
-    P2_MAX_SIZE = 20 if TEST else P2_NORMAL_MAX_SIZE
+    filename = "inputs/day15-test" if TEST else "inputs/day15"
+    with open_input(filename) as data:
+        sensors = parse(data)
 
-    sensors = list(read_inputs(TEST))
-
-    part_1 = count_covered_squares(sensors, row=P1_ROW)
+    part_1 = part1(sensors, row=10 if TEST else P1_ROW)
     print(f"part 1: {part_1}")
 
-    part_2 = tuning_freq(
-        find_uncovered_square(sensors, max_size=P2_MAX_SIZE),
-        max_size=P2_NORMAL_MAX_SIZE,
-    )
+    part_2 = part2(sensors, max_size=20 if TEST else P2_MAX_SIZE, verbose=True)
     print(f"part 2: {part_2}")
 
 
@@ -5,6 +5,8 @@ for the methodology. all i really did was make it less elegant. :)
 import re
 from dataclasses import dataclass
 
+from reader import Buffer, open_input, text_lines
+
 line_pat = re.compile(
     r"^Valve ([A-Z]{2}) has flow rate=(\d+); tunnels? leads? to valves? (.*)$"
 )
@@ -20,16 +22,27 @@ Graph = dict[str, Node]
 Connections = dict[str, dict[str, int]]
 
 
-def load_graph() -> Graph:
+@dataclass(frozen=True)
+class Network:
+    """
+    the parsed valves, along with the shortest distances between them.
+    both parts search the same network, so it's worth building only once.
+    """
+
+    graph: Graph
+    connections: Connections
+    masks: dict[str, int]
+
+
+def parse_graph(data: Buffer) -> Graph:
     graph = {}
-    with open("inputs/day16", encoding="utf-8") as inputs_file:
-        for line in inputs_file:
-            match = line_pat.match(line)
-            if not match:
-                raise ValueError(f"{line=} does not match pattern {line_pat=}")
-
-            id, flow_rate, links = match.groups()
-            graph[id] = Node(flow_rate=int(flow_rate), links=links.split(", "))
+    for line in text_lines(data):
+        match = line_pat.match(line)
+        if not match:
+            raise ValueError(f"{line=} does not match pattern {line_pat=}")
+
+        id, flow_rate, links = match.groups()
+        graph[id] = Node(flow_rate=int(flow_rate), links=links.split(", "))
     return graph
 
 
@@ -92,42 +105,53 @@ def search(
         )
 
 
-def main() -> None:
-    graph = load_graph()
+def parse(data: Buffer) -> Network:
+    graph = parse_graph(data)
     connections = get_connections(graph)
     masks = {name: 1 << i for i, name in enumerate(connections)}
+    return Network(graph=graph, connections=connections, masks=masks)
 
-    results = {}
-    search(
-        graph,
-        start="AA",
-        connections=connections,
-        visited=0,
-        masks=masks,
-        seconds_remaining=30,
-        total_flow=0,
-        results=results,
-    )
-    print(f"part 1: {max(results.values())}")
 
-    results = {}
+def best_flows(network: Network, *, seconds_remaining: int) -> dict[int, int]:
+    """
+    returns the best total flow achievable for each set of opened valves,
+    keyed by the bitmask of those valves.
+    """
+    results: dict[int, int] = {}
     search(
-        graph,
+        network.graph,
         start="AA",
-        connections=connections,
+        connections=network.connections,
         visited=0,
-        masks=masks,
-        seconds_remaining=26,
+        masks=network.masks,
+        seconds_remaining=seconds_remaining,
         total_flow=0,
         results=results,
     )
-    part_2 = max(
+    return results
+
+
+def part1(network: Network) -> int:
+    results = best_flows(network, seconds_remaining=30)
+    return max(results.values())
+
+
+def part2(network: Network) -> int:
+    results = best_flows(network, seconds_remaining=26)
+    return max(
         score_a + score_b
         for a, score_a in results.items()
         for b, score_b in results.items()
         if not a & b
     )
-    print(f"part 2: {part_2}")
+
+
+def main() -> None:
+    with open_input("inputs/day16") as data:
+        network = parse(data)
+
+    print(f"part 1: {part1(network)}")
+    print(f"part 2: {part2(network)}")
 
 
 if __name__ == "__main__":
@@ -2,7 +2,15 @@
 the simplest solution i could think of; LUTs.
 you *can* compute the outcome of a RPS game with modulo, but given that there's
 only nine possible cases... this seems fine.
+
+for the same reason, there's no need to look at each line either. the input is
+scanned for each of the nine in turn, a big block at a time with `bytes.count`,
+and both parts are scored from the resulting histogram.
 """
+from reader import Buffer, open_input
+
+BLOCK_SIZE = 1024 * 1024
+
 # A = rock, B = paper, C = scissors
 # X = rock, Y = paper, Z = scissors
 scores_part_1 = {
@@ -32,10 +40,43 @@ scores_part_2 = {
 }
 
 
-def score(scores: dict[str, int]):
-    with open("inputs/day2", "r") as inputs:
-        return sum(scores[line.strip()] for line in inputs)
+def parse(data: Buffer) -> dict[str, int]:
+    """returns how many times each possible line appears in the strategy guide."""
+    patterns = {line: line.encode() for line in scores_part_1}
+    counts = dict.fromkeys(patterns, 0)
+
+    start = 0
+    while start < len(data):
+        # end each block on a line break, so no line is split between two.
+        end = data.find(b"\n", start + BLOCK_SIZE)
+        end = len(data) if end == -1 else end + 1
+        block = data[start:end]
+        for line, pattern in patterns.items():
+            counts[line] += block.count(pattern)
+        start = end
+
+    return counts
+
+
+def score(counts: dict[str, int], scores: dict[str, int]) -> int:
+    return sum(scores[line] * count for line, count in counts.items())
+
+
+def part1(counts: dict[str, int]) -> int:
+    return score(counts, scores_part_1)
+
+
+def part2(counts: dict[str, int]) -> int:
+    return score(counts, scores_part_2)
+
+
+def main() -> None:
+    with open_input("inputs/day2") as data:
+        counts = parse(data)
+
+    print(f"part 1: {part1(counts)}")
+    print(f"part 2: {part2(counts)}")
 
 
-print(f"part 1: {score(scores_part_1)}")
-print(f"part 2: {score(scores_part_2)}")
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 """
 as with the previous days, both parts of this puzzle can be solved essentially
 the same way, with the only variation being how the input is treated.
+
+each rucksack half is turned into a bitmask of the items in it, with bit
+`priority - 1` set for each item. finding the duplicate is then just an AND of
+the masks, and its priority is the position of the one bit left over.
 """
 from functools import reduce
 from itertools import chain
-from operator import and_
+from operator import and_, or_
 from typing import Generator, Iterable, Iterator
 
+from reader import Buffer, open_input
+
 
 def char_range(start: str, stop: str) -> Generator[str, None, None]:
     """
@@ -16,12 +22,13 @@ def char_range(start: str, stop: str) -> Generator[str, None, None]:
     yield from (chr(i) for i in range(ord(start), ord(stop) + 1))
 
 
-priorities = {
-    c: i + 1 for i, c in enumerate(chain(char_range("a", "z"), char_range("A", "Z")))
-}
+# maps each byte of the input to the bit for that item.
+item_masks = [0] * 256
+for priority, char in enumerate(chain(char_range("a", "z"), char_range("A", "Z"))):
+    item_masks[ord(char)] = 1 << priority
 
 
-def midsplit(line: str) -> tuple[str, str]:
+def midsplit(line: bytes) -> tuple[bytes, bytes]:
     """splits the given line in half and returns both ends."""
     mid = len(line) // 2
     return line[:mid], line[mid:]
@@ -33,32 +40,45 @@ def chunks(iterable: Iterable, size: int) -> Iterator:
     return zip(*iterator)
 
 
-def find_duplicate(*groups: str) -> str:
+def item_mask(items: bytes) -> int:
+    """returns a mask with the bit for each distinct item in `items` set."""
+    return reduce(or_, map(item_masks.__getitem__, items), 0)
+
+
+def find_duplicate(*masks: int) -> int:
     """
-    finds & returns the single duplicate character from the given strings.
-    raises an assertion error if there is more than one duplicate.
+    finds the single item in all of the given masks & returns its priority.
+    raises an assertion error unless there is exactly one duplicate.
     """
-    duplicates = reduce(and_, (set(items) for items in groups))
-    duplicate = duplicates.pop()
-    assert len(duplicates) == 0, "more than one duplicate found"
-    return duplicate
+    duplicates = reduce(and_, masks)
+    assert duplicates, "no duplicate found"
+    duplicate = duplicates & -duplicates
+    assert duplicates == duplicate, "more than one duplicate found"
+    return duplicate.bit_length()
+
+
+def parse(data: Buffer) -> list[tuple[int, int]]:
+    """returns the masks of the items in each half of each rucksack."""
+    halves = map(midsplit, data[:].split())
+    return [(item_mask(left), item_mask(right)) for left, right in halves]
+
+
+def part1(rucksacks: list[tuple[int, int]]) -> int:
+    return sum(find_duplicate(left, right) for left, right in rucksacks)
 
 
-def iter_input() -> Iterator[str]:
-    """yields lines from the input file."""
-    with open("inputs/day3", encoding="utf-8") as input_file:
-        yield from (line.strip() for line in input_file)
+def part2(rucksacks: list[tuple[int, int]]) -> int:
+    whole = (left | right for left, right in rucksacks)
+    return sum(find_duplicate(*group) for group in chunks(whole, 3))
 
 
-def sum_priorities(*duplicates: str) -> int:
-    """returns the sum of the priorities of the given duplicates."""
-    return sum(priorities[duplicate] for duplicate in duplicates)
+def main() -> None:
+    with open_input("inputs/day3") as data:
+        rucksacks = parse(data)
 
+    print(f"part 1: {part1(rucksacks)}")
+    print(f"part 2: {part2(rucksacks)}")
 
-print("part 1: ", end="")
-dupes = (find_duplicate(*midsplit(line)) for line in iter_input())
-print(sum_priorities(*dupes))
 
-print("part 2: ", end="")
-dupes = (find_duplicate(a, b, c) for a, b, c in chunks(iter_input(), 3))
-print(sum_priorities(*dupes))
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,182 @@
+"""
+every line is a pair of ranges, and both parts count the pairs matching some
+predicate. rather than check each pair in turn, all of the numbers are parsed at
+once into an (n, 4) numpy array, and the predicates are applied to whole columns
+of it. the predicates only use `&` & `|`, so they work on single ranges too.
+
+numpy is optional; without it the same predicates are checked a pair at a time.
+"""
+from bisect import bisect_right
 from collections import namedtuple
+from itertools import chain
 
-InclusiveRange = namedtuple("InclusiveRange", "start stop")
-
-
-def input_lines():
-    with open("inputs/day4") as f:
-        lines = (line.strip() for line in f)
-        yield from lines
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
+from reader import open_input
 
-def str_to_range(string):
-    start, stop = string.split("-")
-    return InclusiveRange(int(start), int(stop))
-
+InclusiveRange = namedtuple("InclusiveRange", "start stop")
 
-def str_to_ranges(string):
-    first, second = string.split(",")
-    return str_to_range(first), str_to_range(second)
+# turns "2-4,6-8" into "2 4 6 8", so every number can be split out at once.
+SEPARATORS = bytes.maketrans(b"-,", b"  ")
 
 
 def range_is_subset(a, b):
-    return a.start >= b.start and a.stop <= b.stop
+    return (a.start >= b.start) & (a.stop <= b.stop)
 
 
 def ranges_are_subsets(a, b):
-    return range_is_subset(a, b) or range_is_subset(b, a)
+    return range_is_subset(a, b) | range_is_subset(b, a)
 
 
 def ranges_overlap(a, b):
-    return a.stop >= b.start and a.start <= b.stop
-
-
-def line_has_overlaps(line, predicate):
-    left, right = str_to_ranges(line)
-    return predicate(left, right)
-
-
-part_1 = sum(1 for line in input_lines() if line_has_overlaps(line, ranges_are_subsets))
-print(f"part 1: {part_1}")
-
-part_2 = sum(1 for line in input_lines() if line_has_overlaps(line, ranges_overlap))
-print(f"part 2: {part_2}")
+    return (a.stop >= b.start) & (a.start <= b.stop)
+
+
+def parse(data):
+    """
+    returns the bounds of each pair of ranges, as rows of
+    (first start, first stop, second start, second stop). this is an (n, 4)
+    array if numpy is installed, or a list of tuples if not.
+    """
+    numbers = data[:].translate(SEPARATORS)
+    if np is not None:
+        return np.fromstring(numbers, dtype=np.int64, sep=" ").reshape(-1, 4)
+
+    values = map(int, numbers.split())
+    return list(zip(values, values, values, values))
+
+
+def pairs(bounds):
+    """returns each row of bounds as a pair of ranges."""
+    rows = bounds.tolist() if np is not None else bounds
+    return [(InclusiveRange(a, b), InclusiveRange(c, d)) for a, b, c, d in rows]
+
+
+def count_overlaps(bounds, predicate):
+    if np is not None:
+        first_start, first_stop, second_start, second_stop = bounds.T
+        matches = predicate(
+            InclusiveRange(first_start, first_stop),
+            InclusiveRange(second_start, second_stop),
+        )
+        return int(np.count_nonzero(matches))
+
+    return sum(
+        1
+        for a, b, c, d in bounds
+        if predicate(InclusiveRange(a, b), InclusiveRange(c, d))
+    )
+
+
+def assignments(bounds):
+    """returns every range in the bounds, both from each pair in turn."""
+    return [assignment for pair in pairs(bounds) for assignment in pair]
+
+
+# a node of an interval tree. it holds every range containing `center`, sorted
+# both by start & by stop (largest first), as (bound, index) pairs; ranges
+# entirely before or after `center` are in the `before` & `after` subtrees.
+Node = namedtuple("Node", "center by_start by_stop before after")
+
+
+def build_tree(indices, starts, stops):
+    """builds an interval tree of the ranges at `indices` in `starts` & `stops`."""
+    if not indices:
+        return None
+
+    # splitting at the median endpoint leaves at most half of the ranges
+    # entirely on either side, which keeps the tree balanced.
+    endpoints = sorted(
+        chain(map(starts.__getitem__, indices), map(stops.__getitem__, indices))
+    )
+    center = endpoints[len(endpoints) // 2]
+
+    before = [i for i in indices if stops[i] < center]
+    after = [i for i in indices if starts[i] > center]
+    here = [i for i in indices if starts[i] <= center <= stops[i]]
+
+    return Node(
+        center=center,
+        by_start=sorted((starts[i], i) for i in here),
+        by_stop=sorted(((stops[i], i) for i in here), reverse=True),
+        before=build_tree(before, starts, stops),
+        after=build_tree(after, starts, stops),
+    )
+
+
+class IntervalIndex:
+    """
+    answers which assignments cover a section, or overlap a range of them, in
+    O(log n + k) for k results. results are indices into the ranges given, in
+    no particular order.
+    """
+
+    def __init__(self, ranges):
+        self.ranges = list(ranges)
+        starts = [assignment.start for assignment in self.ranges]
+        stops = [assignment.stop for assignment in self.ranges]
+        self.tree = build_tree(range(len(self.ranges)), starts, stops)
+        self.starts = sorted(zip(starts, range(len(starts))))
+
+    def covering(self, section):
+        """returns the indices of the assignments that include `section`."""
+        found = []
+        node = self.tree
+        while node is not None:
+            if section < node.center:
+                # everything here stops at or after the center, so it only
+                # depends on where they start.
+                for start, index in node.by_start:
+                    if start > section:
+                        break
+                    found.append(index)
+                node = node.before
+            elif section > node.center:
+                for stop, index in node.by_stop:
+                    if stop < section:
+                        break
+                    found.append(index)
+                node = node.after
+            else:
+                found.extend(index for _, index in node.by_start)
+                break
+        return found
+
+    def overlapping(self, query):
+        """returns the indices of the assignments overlapping the range `query`."""
+        # those overlapping a range either cover its start, or start inside it.
+        first = bisect_right(self.starts, (query.start, len(self.ranges)))
+        last = bisect_right(self.starts, (query.stop, len(self.ranges)))
+        inside = [index for _, index in self.starts[first:last]]
+        return self.covering(query.start) + inside
+
+    def covering_all(self, sections):
+        """`covering` for each of many sections at once."""
+        return [self.covering(section) for section in sections]
+
+    def overlapping_all(self, queries):
+        """`overlapping` for each of many ranges at once."""
+        return [self.overlapping(query) for query in queries]
+
+
+def part1(bounds):
+    return count_overlaps(bounds, ranges_are_subsets)
+
+
+def part2(bounds):
+    return count_overlaps(bounds, ranges_overlap)
+
+
+def main():
+    with open_input("inputs/day4") as data:
+        bounds = parse(data)
+
+    print(f"part 1: {part1(bounds)}")
+    print(f"part 2: {part2(bounds)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,11 @@ aoc day 5 - moving stacks of crates with a giant cargo crane!
 """
 import re
 from dataclasses import dataclass
-from typing import Generator
+from typing import Iterable, Iterator
 
-FileLines = Generator[str, None, None]
+from reader import Buffer, open_input, text_lines
+
+FileLines = Iterator[str]
 
 # first dimension; columns
 # second dimension; stacks of crates
@@ -21,14 +23,19 @@ class Instruction:
     quantity: int
 
 
-move_pattern = re.compile(r"^move (\d+) from (\d+) to (\d+)$")
+@dataclass(frozen=True)
+class Manifest:
+    """
+    the parsed puzzle input; the starting stacks & the crane instructions.
+    both parts start from the same manifest, so it's kept immutable. each stack
+    is a string of crates from bottom to top.
+    """
 
+    stacks: tuple[str, ...]
+    instructions: tuple[Instruction, ...]
 
-def input_lines() -> FileLines:
-    """yield lines from the input file with trailing newlinews removed."""
-    with open("inputs/day5", "r", encoding="utf-8") as input_file:
-        lines = (line.rstrip("\n") for line in input_file)
-        yield from lines
+
+move_pattern = re.compile(r"^move (\d+) from (\d+) to (\d+)$")
 
 
 def read_header_lines(lines: FileLines) -> FileLines:
@@ -55,8 +62,11 @@ def parse_crate_stacks(lines: FileLines) -> tuple[FileLines, CrateStacks]:
     for line in header_lines:
         for i, crate in enumerate(line[1::4]):
             if crate != " ":
-                # we're building the columns top-down, so we have to insert at the bottom
-                stacks[i].insert(0, crate)
+                stacks[i].append(crate)
+
+    # we built the columns top-down, so flip them to put the bottom first.
+    for column in stacks:
+        column.reverse()
 
     return lines, stacks
 
@@ -72,21 +82,39 @@ def parse_instruction(line: str) -> Instruction:
     raise ValueError(f"line doesn't match {move_pattern.pattern}: {line}")
 
 
+def move(stacks: CrateStacks, instruction: Instruction, reverse_stacks: bool):
+    """
+    apply a single instruction to the given stacks, moving its crates with a
+    single slice. `reverse_stacks` indicates the order in which the crates
+    should be moved.
+    """
+    source = stacks[instruction.from_column]
+    quantity = instruction.quantity
+    if not quantity:
+        return  # a slice of the last 0 crates would be all of them
+    if quantity > len(source):
+        raise IndexError(f"can't move {quantity} crates from {len(source)}")
+
+    # moving crates one at a time reverses them; moving them all at once
+    # keeps them in order. they're cut before being added to the other
+    # stack, in case that's the same stack.
+    if reverse_stacks:
+        crates = source[-quantity:]
+    else:
+        crates = source[: -quantity - 1 : -1]
+    del source[-quantity:]
+    stacks[instruction.to_column].extend(crates)
+
+
 def run_instructions(
-    stacks: CrateStacks, instructions: list[Instruction], reverse_stacks: bool
+    stacks: CrateStacks, instructions: Iterable[Instruction], reverse_stacks: bool
 ):
     """
     apply a list of instructions to the given stacks.
     `reverse_stacks` indicates the order in which the crates should be moved.
     """
     for instruction in instructions:
-        crates = [
-            stacks[instruction.from_column].pop() for _ in range(instruction.quantity)
-        ]
-        if reverse_stacks:
-            stacks[instruction.to_column].extend(reversed(crates))
-        else:
-            stacks[instruction.to_column].extend(crates)
+        move(stacks, instruction, reverse_stacks)
 
 
 def get_tops(stacks: CrateStacks) -> str:
@@ -94,24 +122,117 @@ def get_tops(stacks: CrateStacks) -> str:
     return "".join(column[-1] for column in stacks)
 
 
-def solve(*, reverse_stacks: bool = False) -> str:
+def parse(data: Buffer) -> Manifest:
+    """parse the starting stacks & the crane instructions from the input."""
+    # part of the iterator is consumed by parsing the stacks
+    lines, stacks = parse_crate_stacks(text_lines(data))
+
+    # the rest is consumed as crane instructions
+    instructions = tuple(parse_instruction(line) for line in lines)
+
+    return Manifest(
+        stacks=tuple("".join(column) for column in stacks),
+        instructions=instructions,
+    )
+
+
+def solve(manifest: Manifest, *, reverse_stacks: bool) -> str:
     """
-    load stacks & instructions from the input file, apply the instructions, and
-    return the top crate of each stack as a string.
+    apply the instructions to a fresh copy of the manifest's stacks, and return
+    the top crate of each stack as a string.
 
     `reverse_stacks` flips the order that crates are moved from one column to
     another. this is all that's required to solve part 2.
     """
-    # part of the generator is consumed by parsing the stacks
-    lines, stacks = parse_crate_stacks(input_lines())
+    stacks = [list(column) for column in manifest.stacks]
+    run_instructions(stacks, manifest.instructions, reverse_stacks)
+    return get_tops(stacks)
 
-    # the rest is consumed as crane instructions
-    instructions = [parse_instruction(line) for line in lines]
 
-    run_instructions(stacks, instructions, reverse_stacks)
+def trace(manifest: Manifest, *, reverse_stacks: bool) -> str:
+    """
+    find the same answer as `solve`, without moving any crates.
 
-    return get_tops(stacks)
+    only the final top of each stack matters, so instead this walks the
+    instructions backwards, following where each of those crates came from
+    until it's back in the starting stacks. this costs O(instructions *
+    columns) however many crates each instruction moves, so it wins when the
+    crane moves huge batches around a handful of stacks.
+    """
+    heights = [len(column) for column in manifest.stacks]
+    for instruction in manifest.instructions:
+        if instruction.quantity > heights[instruction.from_column]:
+            raise IndexError(
+                f"can't move {instruction.quantity} crates "
+                f"from {heights[instruction.from_column]}"
+            )
+        heights[instruction.from_column] -= instruction.quantity
+        heights[instruction.to_column] += instruction.quantity
+
+    if not all(heights):
+        raise IndexError("a stack ends up empty, so it has no top crate")
+
+    # (column, height) of each crate being followed, counting from the bottom.
+    positions = [(column, height - 1) for column, height in enumerate(heights)]
+    for instruction in reversed(manifest.instructions):
+        source = instruction.from_column
+        target = instruction.to_column
+        quantity = instruction.quantity
+
+        # put the heights back to how they were before this instruction.
+        heights[target] -= quantity
+        heights[source] += quantity
+
+        # where the moved crates were put, and where they were taken from.
+        moved_to = heights[target] - (quantity if source == target else 0)
+        moved_from = heights[source] - quantity
+
+        for i, (column, height) in enumerate(positions):
+            if column != target or height < moved_to:
+                continue
+            offset = height - moved_to
+            if reverse_stacks:
+                positions[i] = (source, moved_from + offset)
+            else:
+                positions[i] = (source, moved_from + quantity - 1 - offset)
+
+    return "".join(manifest.stacks[column][height] for column, height in positions)
+
+
+def stream(lines: Iterable[str]) -> tuple[str, str]:
+    """
+    solve both parts in a single pass over the input, applying each
+    instruction to a set of stacks for each part as soon as it's read. the
+    instructions are never stored, so memory only depends on how many crates
+    there are, however long the list of instructions gets.
+    """
+    lines, stacks = parse_crate_stacks(iter(lines))
+    one_at_a_time = [list(column) for column in stacks]
+    all_at_once = stacks
+
+    for line in lines:
+        instruction = parse_instruction(line)
+        move(one_at_a_time, instruction, reverse_stacks=False)
+        move(all_at_once, instruction, reverse_stacks=True)
+
+    return get_tops(one_at_a_time), get_tops(all_at_once)
+
+
+def part1(manifest: Manifest) -> str:
+    return solve(manifest, reverse_stacks=False)
+
+
+def part2(manifest: Manifest) -> str:
+    return solve(manifest, reverse_stacks=True)
+
+
+def main() -> None:
+    with open_input("inputs/day5") as data:
+        part_1, part_2 = stream(text_lines(data))
+
+    print(f"part 1: {part_1}")
+    print(f"part 2: {part_2}")
 
 
-print(f"part 1: {solve()}")
-print(f"part 2: {solve(reverse_stacks=True)}")
+if __name__ == "__main__":
+    main()
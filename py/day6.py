@@ -1,13 +1,171 @@
-def find_marker(stream: str, length: int) -> int:
-    for i in range(0, len(stream) - length):
-        if len(set(stream[i : i + length])) == length:
-            return i + length
-    raise ValueError("no solution")
+"""
+a marker is the end of the first run of `length` different characters.
 
+rather than check every window of characters separately, this keeps track of
+the longest run of different characters ending at each position, using where
+each character was last seen. that finds markers of every length in a single
+pass, and only ever needs one character at a time, so the signal can be read
+in chunks.
 
-with open("inputs/day6") as inputs_file:
-    stream = inputs_file.read()
+for really big signals, the chunks can also be searched at the same time on a
+pool of processes, each overlapping the last by enough to fit a marker.
+"""
+import os
+from typing import Iterable, Iterator
 
+from reader import Buffer, chunks, open_input
 
-print(f"part 1: {find_marker(stream, 4)}")
-print(f"part 2: {find_marker(stream, 14)}")
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def scan(
+    stream: Iterable[str] | Iterable[bytes], lengths: Iterable[int]
+) -> Iterator[tuple[int, int]]:
+    """
+    yields each marker length with the position it ends at as soon as it's
+    found, reading the stream a chunk at a time. reading stops once every
+    marker has been found.
+    """
+    pending = sorted(set(lengths), reverse=True)
+    if not pending:
+        return
+
+    last_seen: dict[int | str, int] = {}
+    run_start = 0
+    position = 0
+
+    for chunk in stream:
+        for char in chunk:
+            # the run can't include the previous copy of this character.
+            previous = last_seen.get(char, -1)
+            if previous >= run_start:
+                run_start = previous + 1
+            last_seen[char] = position
+            position += 1
+
+            # longer runs take longer to find, so only the shortest pending
+            # marker can have been reached.
+            while pending and position - run_start >= pending[-1]:
+                yield pending.pop(), position
+            if not pending:
+                return
+
+
+def find_markers(
+    stream: Iterable[str] | Iterable[bytes], lengths: Iterable[int]
+) -> dict[int, int]:
+    """returns where the marker of each length ends."""
+    lengths = set(lengths)
+    markers = dict(scan(stream, lengths))
+    if missing := lengths - markers.keys():
+        raise ValueError(f"no marker of length {min(missing)}")
+    return markers
+
+
+def find_marker(stream: str | bytes, length: int) -> int:
+    return find_markers([stream], [length])[length]
+
+
+def signal_length(data: Buffer) -> int:
+    """the length of the signal, leaving out any whitespace after it."""
+    size = len(data)
+    while size and data[size - 1 : size].isspace():
+        size -= 1
+    return size
+
+
+def search_range(
+    path: str, start: int, stop: int, lengths: list[int]
+) -> dict[int, int]:
+    """
+    find the first marker of each length ending between `start` (exclusive) &
+    `stop` (inclusive). as many characters before `start` are read as the
+    longest marker needs, so no marker is missed at the edge of a range.
+    """
+    first = max(0, start - max(lengths) + 1)
+    with open_input(path) as data:
+        window = data[first:stop]
+    return {length: first + end for length, end in scan([window], lengths)}
+
+
+def parallel_markers(
+    path: str, lengths: Iterable[int], *, jobs: int = 0, chunk_size: int = CHUNK_SIZE
+) -> dict[int, int]:
+    """
+    find markers like `find_markers`, but searching the file at `path` in
+    `chunk_size` ranges at once, on `jobs` processes (0 means one per cpu).
+    as soon as the earliest marker of every length is known, the ranges after
+    it are cancelled.
+    """
+    # only imported here, as it pulls in most of multiprocessing, which would
+    # slow down starting up for the single process search.
+    from concurrent.futures import ProcessPoolExecutor
+
+    lengths = sorted(set(lengths))
+    if not lengths:
+        return {}
+    with open_input(path) as data:
+        size = signal_length(data)
+
+    markers: dict[int, int] = {}
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(
+                search_range, path, start, min(start + chunk_size, size), lengths
+            )
+            for start in range(0, size, chunk_size)
+        ]
+
+        # results are taken in order, so the first range to find a marker has
+        # the earliest one.
+        for future in futures:
+            for length, end in future.result().items():
+                markers.setdefault(length, end)
+            if len(markers) == len(lengths):
+                pool.shutdown(wait=False, cancel_futures=True)
+                break
+
+    if missing := set(lengths) - markers.keys():
+        raise ValueError(f"no marker of length {min(missing)}")
+    return markers
+
+
+def parse(data: Buffer) -> bytes:
+    return data[:].strip()
+
+
+def part1(stream: bytes) -> int:
+    return find_marker(stream, 4)
+
+
+def part2(stream: bytes) -> int:
+    return find_marker(stream, 14)
+
+
+def main() -> None:
+    import argparse  # only the script needs it, not the runner
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default="inputs/day6")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="processes to search the signal with; 0 means one per cpu.",
+    )
+    args = parser.parse_args()
+
+    if args.jobs == 1:
+        with open_input(args.input) as data:
+            # the signal has no whitespace in it, but the file ends with a newline.
+            signal = (chunk.strip() for chunk in chunks(data))
+            markers = find_markers(signal, (4, 14))
+    else:
+        markers = parallel_markers(args.input, (4, 14), jobs=args.jobs)
+
+    print(f"part 1: {markers[4]}")
+    print(f"part 2: {markers[14]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,9 @@
 from dataclasses import dataclass
-from typing import Generator
+from typing import Iterable
 
-InputLines = Generator[str, None, None]
+from reader import Buffer, open_input, text_lines
 
-
-def input_lines() -> InputLines:
-    with open("inputs/day7") as f:
-        lines = (line.strip() for line in f)
-        yield from lines
+InputLines = Iterable[str]
 
 
 @dataclass
@@ -135,15 +131,30 @@ def find_deletion_candidate(node: FSNode, minimum: int) -> int:
     return best
 
 
-fs = parse_fs(input_lines())
-# print_tree(fs.tree)
+def parse(data: Buffer) -> FS:
+    return parse_fs(line.strip() for line in text_lines(data))
+
+
+def part1(fs: FS) -> int:
+    return size_directories(fs.tree, 100000)
+
+
+def part2(fs: FS) -> int:
+    total_space = 70000000
+    needed = 30000000
+    available = total_space - fs.tree.calculate_size()
+    minimum = needed - available
+    return find_deletion_candidate(fs.tree, minimum)
+
+
+def main() -> None:
+    with open_input("inputs/day7") as data:
+        fs = parse(data)
+    # print_tree(fs.tree)
+
+    print(f"part 1: {part1(fs)}")
+    print(f"part 2: {part2(fs)}")
 
-part_1 = size_directories(fs.tree, 100000)
-print(f"part 1: {part_1}")
 
-total_space = 70000000
-needed = 30000000
-available = total_space - fs.tree.calculate_size()
-minimum = needed - available
-part_2 = find_deletion_candidate(fs.tree, minimum)
-print(f"part 2: {part_2}")
+if __name__ == "__main__":
+    main()
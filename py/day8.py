@@ -1,14 +1,14 @@
 import math
 
+from reader import Buffer, open_input, text_lines
+
 coord = tuple[int, int]
 each_direction = [(1, 0), (-1, 0), (0, 1), (0, -1)]
 
 
-def input_grid() -> list[str]:
-    with open("inputs/day8") as inputs_file:
-        lines = inputs_file.read().split("\n")
-        # sometimes there's a blank line at the end
-        return [line for line in lines if line]
+def parse(data: Buffer) -> list[str]:
+    # sometimes there's a blank line at the end
+    return [line for line in text_lines(data) if line]
 
 
 def is_in_bounds(tree: coord, *, grid: list[str]) -> bool:
@@ -53,14 +53,27 @@ def score(tree: coord, *, grid: list[str]) -> int:
     )
 
 
-grid = input_grid()
+def part1(grid: list[str]) -> int:
+    return sum(
+        visible((y, x), grid=grid)
+        for y in range(len(grid))
+        for x in range(len(grid[y]))
+    )
+
+
+def part2(grid: list[str]) -> int:
+    return max(
+        score((y, x), grid=grid) for y in range(len(grid)) for x in range(len(grid[y]))
+    )
+
+
+def main() -> None:
+    with open_input("inputs/day8") as data:
+        grid = parse(data)
+
+    print(f"part 1: {part1(grid)}")
+    print(f"part 2: {part2(grid)}")
 
-part_1 = sum(
-    visible((y, x), grid=grid) for y in range(len(grid)) for x in range(len(grid[y]))
-)
-print(f"part 1: {part_1}")
 
-part_2 = max(
-    score((y, x), grid=grid) for y in range(len(grid)) for x in range(len(grid[y]))
-)
-print(f"part 2: {part_2}")
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 """day 9: rope bridge"""
-from typing import Generator
+from typing import Iterable
+
+from reader import Buffer, open_input, text_lines
 
-InputLines = Generator[str, None, None]
 Coord = tuple[int, int]
+Move = tuple[Coord, int]
 
 
 letter_to_direction = {
@@ -13,13 +15,6 @@ letter_to_direction = {
 }
 
 
-def input_lines() -> InputLines:
-    """yields lines from the puzzle input file."""
-    with open("inputs/day9", encoding="utf-8") as inputs_file:
-        lines = (line.strip() for line in inputs_file)
-        yield from lines
-
-
 def sign(num: int) -> int:
     """
     returns the sign of the number.
@@ -74,7 +69,7 @@ class Rope:
             follow = self.nodes[i]
 
 
-def simulate(rope: Rope, moves: Generator[tuple[Coord, int], None, None]) -> set[Coord]:
+def simulate(rope: Rope, moves: Iterable[Move]) -> set[Coord]:
     """
     moves the head of the rope with the given sequence of moves.
     returns a set of all coordinates visited by the tail.
@@ -87,7 +82,7 @@ def simulate(rope: Rope, moves: Generator[tuple[Coord, int], None, None]) -> set
     return tail_visited
 
 
-def line_to_move(line: str) -> tuple[Coord, int]:
+def line_to_move(line: str) -> Move:
     """
     "R 4" -> ((1, 0), 4)
     """
@@ -95,16 +90,39 @@ def line_to_move(line: str) -> tuple[Coord, int]:
     return letter_to_direction[letter], int(count)
 
 
-def solve(nodes: int) -> int:
+def parse(data: Buffer) -> list[Move]:
+    """parse each line of the input into a move."""
+    return [line_to_move(line) for line in text_lines(data)]
+
+
+def solve(moves: list[Move], nodes: int) -> int:
     """
     run the input moves on a rope with the given number of nodes.
     return the number of unique locations visited by the tail.
     """
     rope = Rope(nodes)
-    moves = (line_to_move(line) for line in input_lines())
     tail_visited = simulate(rope, moves)
     return len(tail_visited)
 
 
-print(f"part 1: {solve(2)}")
-print(f"part 2: {solve(10)}")
+def part1(moves: list[Move]) -> int:
+    """number of locations visited by the tail of a two-node rope."""
+    return solve(moves, 2)
+
+
+def part2(moves: list[Move]) -> int:
+    """number of locations visited by the tail of a ten-node rope."""
+    return solve(moves, 10)
+
+
+def main() -> None:
+    """solve both parts of the puzzle with the input file."""
+    with open_input("inputs/day9") as data:
+        moves = parse(data)
+
+    print(f"part 1: {part1(moves)}")
+    print(f"part 2: {part2(moves)}")
+
+
+if __name__ == "__main__":
+    main()
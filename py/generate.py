@@ -0,0 +1,429 @@
+"""
+generates synthetic puzzle inputs at a chosen scale.
+
+every generator takes a scale & a seeded rng and returns the text of a valid
+input for that day. what "scale" means differs per day; see each generator's
+docstring. run it from the root of the project like so:
+
+$ python py/generate.py --scale 1000 --out inputs-1000
+"""
+import argparse
+import itertools
+import os
+import random
+import string
+from typing import Callable, Iterator
+
+Generator = Callable[[int, random.Random], str]
+
+LETTERS = string.ascii_lowercase + string.ascii_uppercase
+
+
+def day1(scale: int, rng: random.Random) -> str:
+    """`scale` elves, each carrying a handful of snacks."""
+    blocks = (
+        "\n".join(str(rng.randint(1000, 60000)) for _ in range(rng.randint(1, 10)))
+        for _ in range(scale)
+    )
+    return "\n\n".join(blocks) + "\n"
+
+
+def day2(scale: int, rng: random.Random) -> str:
+    """`scale` rounds of rock paper scissors."""
+    return "".join(f"{rng.choice('ABC')} {rng.choice('XYZ')}\n" for _ in range(scale))
+
+
+def day3(scale: int, rng: random.Random) -> str:
+    """
+    `scale` rucksacks, rounded up to a whole number of groups of three.
+
+    each group shares a single badge, and each rucksack has a single item in
+    both compartments. everything else is drawn from a pool of letters that no
+    other rucksack in the group can use.
+    """
+    lines = []
+    for _ in range((scale + 2) // 3):
+        badge, *rest = rng.sample(LETTERS, len(LETTERS))
+        pools = [rest[i::3] for i in range(3)]
+        for pool in pools:
+            duplicate, *others = pool
+            left_pool, right_pool = others[::2], others[1::2]
+            size = rng.randint(2, 24)
+            left = [duplicate, badge, *rng.choices(left_pool, k=size - 2)]
+            right = [duplicate, *rng.choices(right_pool, k=size - 1)]
+            rng.shuffle(left)
+            rng.shuffle(right)
+            lines.append("".join(left + right))
+    return "\n".join(lines) + "\n"
+
+
+def day4(scale: int, rng: random.Random) -> str:
+    """`scale` pairs of section assignments."""
+
+    def assignment() -> str:
+        start = rng.randint(1, 99)
+        return f"{start}-{rng.randint(start, 99)}"
+
+    return "".join(f"{assignment()},{assignment()}\n" for _ in range(scale))
+
+
+def day5(scale: int, rng: random.Random) -> str:
+    """
+    nine stacks holding `scale` crates between them (at least two each), and
+    `scale` instructions.
+    moves never empty a stack, so every column has a top crate at the end.
+    """
+    columns = 9
+    heights = [2] * columns
+    for _ in range(max(scale - 2 * columns, 0)):
+        heights[rng.randrange(columns)] += 1
+
+    stacks = [[rng.choice(string.ascii_uppercase) for _ in range(h)] for h in heights]
+    header = []
+    for level in reversed(range(max(heights))):
+        cells = (
+            f"[{stack[level]}]" if level < len(stack) else "   " for stack in stacks
+        )
+        header.append(" ".join(cells))
+    header.append(" ".join(f" {i + 1} " for i in range(columns)))
+
+    instructions = []
+    for _ in range(scale):
+        from_column = rng.choice([i for i, h in enumerate(heights) if h > 1])
+        to_column = rng.choice([i for i in range(columns) if i != from_column])
+        quantity = rng.randint(1, heights[from_column] - 1)
+        heights[from_column] -= quantity
+        heights[to_column] += quantity
+        instructions.append(
+            f"move {quantity} from {from_column + 1} to {to_column + 1}"
+        )
+
+    return "\n".join(header) + "\n\n" + "\n".join(instructions) + "\n"
+
+
+def day6(scale: int, rng: random.Random) -> str:
+    """
+    `scale` characters of noise, followed by both markers.
+    the noise only uses three letters, so it can never contain a marker.
+    """
+    noise = "".join(rng.choices("abc", k=scale))
+    return noise + "defghijklmnopq" + "abc\n"
+
+
+def day7(scale: int, rng: random.Random) -> str:
+    """
+    a terminal session exploring `scale` files & directories.
+
+    files are sized once the whole tree is known, so that like the real inputs
+    they fill 45M-65M of the 70M disk. almost every file is small, leaving lots
+    of directories under part 1's 100000 limit. one big file somewhere below
+    the root is enough to free the space part 2 needs, so the directory to
+    delete isn't just the root, & the root's first file takes up the rest.
+    """
+    lines = ["$ cd /"]
+    files = []  # the line each file is listed on, its name, & how deep it is
+    depth = 0
+    names = (f"n{i}" for i in itertools.count())
+    remaining = scale
+    while remaining > 0:
+        lines.append("$ ls")
+        dirs = []
+        for _ in range(min(rng.randint(1, 6), remaining)):
+            name = next(names)
+            # the first entry is always a file in the root, to take up the rest.
+            if files and rng.random() < 0.3:
+                lines.append(f"dir {name}")
+                dirs.append(name)
+            else:
+                files.append((len(lines), f"{name}.{rng.choice('abc')}", depth))
+                lines.append("")
+            remaining -= 1
+
+        if dirs and depth < 20:
+            lines.append(f"$ cd {rng.choice(dirs)}")
+            depth += 1
+        elif depth > 0:
+            up = rng.randint(1, depth)
+            lines.extend(["$ cd .."] * up)
+            depth -= up
+
+    used = rng.randint(45_000_000, 65_000_000)
+    needed = used - 40_000_000
+    small_limit = max(1, min(50_000, 10_000_000 // len(files)))
+    sizes = [rng.randint(1, small_limit) for _ in files]
+
+    rest = used - sum(sizes[1:])
+    nested = [index for index, (_, _, depth) in enumerate(files) if depth > 0]
+    if nested:
+        big = rng.choice(nested)
+        sizes[big] = rng.randint(needed, rest - 1)
+        rest -= sizes[big]
+    sizes[0] = rest
+
+    for (line, name, _), size in zip(files, sizes):
+        lines[line] = f"{size} {name}"
+    return "\n".join(lines) + "\n"
+
+
+def day8(scale: int, rng: random.Random) -> str:
+    """a `scale` x `scale` grid of trees."""
+    return "".join(
+        "".join(rng.choices(string.digits, k=scale)) + "\n" for _ in range(scale)
+    )
+
+
+def day9(scale: int, rng: random.Random) -> str:
+    """`scale` moves of the rope's head."""
+    return "".join(f"{rng.choice('RULD')} {rng.randint(1, 20)}\n" for _ in range(scale))
+
+
+def day10(scale: int, rng: random.Random) -> str:
+    """
+    a random program. the crt is fixed at 40x6, so the program always runs for
+    exactly 240 cycles and `scale` is ignored.
+    """
+    lines = []
+    cycles = 0
+    while cycles < 240:
+        if cycles < 239 and rng.random() < 0.6:
+            lines.append(f"addx {rng.randint(-10, 10)}")
+            cycles += 2
+        else:
+            lines.append("noop")
+            cycles += 1
+    return "\n".join(lines) + "\n"
+
+
+def primes() -> Iterator[int]:
+    """yields prime numbers, forever."""
+    found: list[int] = []
+    for candidate in itertools.count(2):
+        if all(candidate % prime for prime in found):
+            found.append(candidate)
+            yield candidate
+
+
+def day11(scale: int, rng: random.Random) -> str:
+    """
+    `scale` monkeys (at least three), each starting with a handful of items.
+
+    like the real inputs, only one monkey squares its worry levels. with more,
+    part 1 (which never takes a modulo) would spend its time multiplying huge
+    numbers, however many monkeys there are.
+    """
+    scale = max(scale, 3)
+    squarer = rng.randrange(scale)
+    rules = []
+    for num, prime in zip(range(scale), primes()):
+        items = ", ".join(str(rng.randint(50, 99)) for _ in range(rng.randint(1, 8)))
+        if num == squarer:
+            operation = "old * old"
+        else:
+            operation = rng.choice(
+                [f"old * {rng.randint(2, 19)}", f"old + {rng.randint(1, 8)}"]
+            )
+        if_true, if_false = rng.sample([i for i in range(scale) if i != num], 2)
+        rules.append(
+            f"Monkey {num}:\n"
+            f"  Starting items: {items}\n"
+            f"  Operation: new = {operation}\n"
+            f"  Test: divisible by {prime}\n"
+            f"    If true: throw to monkey {if_true}\n"
+            f"    If false: throw to monkey {if_false}\n"
+        )
+    return "\n".join(rules)
+
+
+def day12(scale: int, rng: random.Random) -> str:
+    """
+    a `scale` x `scale` heightmap rising from the top left to the bottom
+    right. scales below 14 are rounded up, since the climb needs to reach z.
+
+    the top row & right column are left untouched so there is always a route
+    around the edge; everything else is randomly dug out.
+    """
+    size = max(scale, 14)
+    lines = []
+    for row in range(size):
+        line = []
+        for col in range(size):
+            height = min(25, (row + col) * 26 // (2 * size - 1))
+            if row > 0 and col < size - 1 and rng.random() < 0.2:
+                height = max(0, height - rng.randint(1, 3))
+            line.append(chr(ord("a") + height))
+        lines.append(line)
+    lines[0][0] = "S"
+    lines[-1][-1] = "E"
+    return "".join("".join(line) + "\n" for line in lines)
+
+
+def day13(scale: int, rng: random.Random) -> str:
+    """`scale` pairs of packets."""
+
+    def packet(depth: int) -> str:
+        items = []
+        for _ in range(rng.randint(0, 5)):
+            if depth < 4 and rng.random() < 0.3:
+                items.append(packet(depth + 1))
+            else:
+                items.append(str(rng.randint(0, 10)))
+        return f"[{','.join(items)}]"
+
+    return "\n".join(f"{packet(0)}\n{packet(0)}\n" for _ in range(scale))
+
+
+def day14(scale: int, rng: random.Random) -> str:
+    """`scale` rock paths, spread over a cave roughly `scale` deep."""
+    depth = max(scale, 10)
+    lines = []
+    for _ in range(scale):
+        x = rng.randint(max(0, 500 - depth), 500 + depth)
+        y = rng.randint(2, depth)
+        points = [f"{x},{y}"]
+        for i in range(rng.randint(1, 4)):
+            if i % 2:
+                y = rng.randint(2, depth)
+            else:
+                x = rng.randint(max(0, x - 10), x + 10)
+            points.append(f"{x},{y}")
+        lines.append(" -> ".join(points))
+    return "\n".join(lines) + "\n"
+
+
+def day15(scale: int, rng: random.Random) -> str:
+    """
+    `scale` sensors, at least four, leaving a single uncovered square inside the
+    search area.
+
+    four sensors sit diagonally around the hidden square with their edges just
+    touching it, which covers the whole search area by themselves. the rest are
+    scattered at random and shrunk until they don't reach the hidden square.
+    """
+    size = 4000000
+    hidden = (rng.randint(1, size - 1), rng.randint(1, size - 1))
+
+    def distance(a: tuple[int, int], b: tuple[int, int]) -> int:
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    sensors = [
+        ((hidden[0] + dx * size, hidden[1] + dy * size), 2 * size - 1)
+        for dx, dy in itertools.product((-1, 1), repeat=2)
+    ]
+    for _ in range(max(scale - 4, 0)):
+        position = (rng.randint(0, size), rng.randint(0, size))
+        radius = min(rng.randint(1, size // 4), distance(position, hidden) - 1)
+        sensors.append((position, radius))
+
+    return "".join(
+        f"Sensor at x={x}, y={y}: closest beacon is at x={x + radius}, y={y}\n"
+        for (x, y), radius in sensors
+    )
+
+
+def day16(scale: int, rng: random.Random) -> str:
+    """
+    `scale` valves connected by tunnels, between 2 & 676 of them.
+    as in the real puzzle, at most 15 valves have a non-zero flow rate.
+    """
+    scale = min(max(scale, 2), 26 * 26)
+    names = ["AA"] + rng.sample(
+        [
+            a + b
+            for a, b in itertools.product(string.ascii_uppercase, repeat=2)
+            if a + b != "AA"
+        ],
+        scale - 1,
+    )
+
+    links: dict[str, set[str]] = {name: set() for name in names}
+
+    def connect(a: str, b: str) -> None:
+        links[a].add(b)
+        links[b].add(a)
+
+    # a random spanning tree keeps every valve reachable, then a few shortcuts.
+    for i, name in enumerate(names[1:], start=1):
+        connect(name, rng.choice(names[:i]))
+    for _ in range(scale // 4):
+        a, b = rng.sample(names, 2)
+        connect(a, b)
+
+    flowing = set(rng.sample(names[1:], min(15, scale // 4 + 1)))
+
+    lines = []
+    for name in names:
+        flow_rate = rng.randint(1, 25) if name in flowing else 0
+        targets = sorted(links[name])
+        if len(targets) == 1:
+            tunnels = f"tunnel leads to valve {targets[0]}"
+        else:
+            tunnels = f"tunnels lead to valves {', '.join(targets)}"
+        lines.append(f"Valve {name} has flow rate={flow_rate}; {tunnels}")
+    return "\n".join(lines) + "\n"
+
+
+GENERATORS: dict[int, Generator] = {
+    1: day1,
+    2: day2,
+    3: day3,
+    4: day4,
+    5: day5,
+    6: day6,
+    7: day7,
+    8: day8,
+    9: day9,
+    10: day10,
+    11: day11,
+    12: day12,
+    13: day13,
+    14: day14,
+    15: day15,
+    16: day16,
+}
+
+
+def generate(day: int, scale: int, *, seed: int = 0) -> str:
+    """returns the text of a generated input for the given day."""
+    rng = random.Random(f"{day}:{scale}:{seed}")
+    return GENERATORS[day](scale, rng)
+
+
+def write_inputs(
+    out_dir: str, *, scale: int, days: list[int], seed: int = 0
+) -> list[str]:
+    """
+    writes generated inputs for each of `days` into `out_dir`, named like the
+    real inputs. returns the paths written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for day in days:
+        path = os.path.join(out_dir, f"day{day}")
+        with open(path, "w", encoding="utf-8") as out_file:
+            out_file.write(generate(day, scale, seed=seed))
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, required=True)
+    parser.add_argument("--out", required=True, help="directory to write into.")
+    parser.add_argument(
+        "--day",
+        type=int,
+        action="append",
+        choices=sorted(GENERATORS),
+        help="day to generate. can be given more than once. defaults to every day.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path in write_inputs(
+        args.out, scale=args.scale, days=args.day or sorted(GENERATORS), seed=args.seed
+    ):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,637 @@
+"""
+parser combinators.
+
+parsers never slice off the rest of the stream as they go. instead each one
+takes the stream plus the position to start from, and returns the position it
+stopped at, so parsing costs the same no matter how much input is left over.
+
+streams can be text, or bytes-like (bytes, an mmap, a memoryview) as long as the
+literals in the grammar are bytes too.
+
+most grammars are regular, so combinators also describe themselves as a regex
+where they can. `compiled` turns a whole tree of them into a single regex match
+plus some conversion functions, falling back to the combinators themselves when
+part of the tree can't be expressed that way (like `take_while`).
+
+combinators commit to the first way they find to match, and never backtrack, so
+wherever a regex could match more than one way it's made an atomic group, which
+commits the same way. python only has those from 3.11 on; before that, `compiled`
+leaves parsers as they are. run this module to check that the compiled parsers
+agree with the combinators.
+"""
+import argparse
 import itertools
-import string
-from typing import Callable, TypeVar
+import random
+import re
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Generic,
+    Iterable,
+    Iterator,
+    Sequence,
+    TypeVar,
+)
+
+from reader import Buffer
 
 T = TypeVar("T")
-Parse = tuple[T, str]  # (parsed value, remaining stream)
-Parser = Callable[[str], Parse[T]]
+U = TypeVar("U")
+Stream = str | Buffer | memoryview
+Parse = tuple[T, int]  # (parsed value, position after it)
+Parser = Callable[[Stream, int], Parse[T]]
+
+
+def piece(stream: Stream, start: int, stop: int) -> str | bytes:
+    """a slice of the stream, as bytes rather than a view if it's a memoryview."""
+    chunk = stream[start:stop]
+    if isinstance(chunk, memoryview):
+        return chunk.tobytes()
+    return chunk
 
 
 class ParseError(Exception):
-    def __init__(self, expected: str, stream: str):
-        if len(stream) > 50:
-            stream = stream[:47] + "..."
-        super().__init__(f"expected {expected!r} in {stream!r}")
+    def __init__(self, expected: str | bytes, stream: Stream, position: int = 0):
+        self.position = position
+        context = piece(stream, position, position + 50)
+        if len(context) == 50:
+            ellipsis = "..." if isinstance(context, str) else b"..."
+            context = context[:47] + ellipsis
+        super().__init__(f"expected {expected!r} at {position} in {context!r}")
+
+
+def matcher(regex: str) -> Callable[[Stream, int], re.Match | None]:
+    """
+    returns a function matching `regex` at a position in a stream, compiled
+    ahead of time for both text & bytes streams.
+    """
+    text_pattern = re.compile(regex)
+    try:
+        bytes_pattern = re.compile(regex.encode("latin-1"))
+    except UnicodeEncodeError:
+        bytes_pattern = None  # the grammar has text no bytes stream could match
+
+    def match(stream: Stream, position: int) -> re.Match | None:
+        if isinstance(stream, str):
+            return text_pattern.match(stream, position)
+        if bytes_pattern is None:
+            raise TypeError(f"{regex!r} can only match text")
+        return bytes_pattern.match(stream, position)
+
+    return match
+
+
+@dataclass(frozen=True)
+class Regular(Generic[T]):
+    """
+    a parser written as a regex. `pattern` has `groups` capture groups, which
+    `convert` turns into the parser's value; `bare` is the same regex without
+    any capture groups, for when only the extent of a match matters.
 
+    both have to be atomic, matching at most one way wherever they're used, so
+    that what follows them can't make them match differently.
+    """
 
-def exact(expected: str) -> Parser[str]:
-    def parser(stream: str) -> Parse[str]:
-        if not stream.startswith(expected):
-            raise ParseError(expected, stream)
-        return expected, stream[len(expected) :]
+    pattern: str
+    bare: str
+    groups: int
+    convert: Callable[[Sequence[Any]], T]
 
+
+def regular(parser: Parser[T]) -> Regular[T] | None:
+    """the regex form of a parser, if it has one."""
+    return getattr(parser, "regular", None)
+
+
+def with_regular(parser: Parser[T], form: Regular[T] | None) -> Parser[T]:
+    if form is not None:
+        parser.regular = form  # type: ignore[attr-defined]
     return parser
 
 
-def take_while(predicate: Callable[[str], bool]) -> Parser[str]:
-    def parser(stream: str) -> Parse[str]:
-        match = "".join(itertools.takewhile(predicate, stream))
-        return match, stream[len(match) :]
+def atomic(regex: str) -> str:
+    """`regex` as an atomic group, which never gives back what it matched."""
+    return f"(?>{regex})"
+
+
+def literal(value: str | bytes) -> str:
+    """a literal as an escaped regex, so text & bytes grammars both fit one."""
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    return re.escape(value)
+
+
+def compiled(parser: Parser[T]) -> Parser[T]:
+    """
+    returns a parser equivalent to `parser` that does all of its work in a
+    single regex match, or `parser` itself if it has no regex form (or this
+    python can't compile it).
+    """
+    form = regular(parser)
+    if form is None:
+        return parser
+
+    try:
+        match = matcher(form.pattern)
+    except re.error:
+        return parser  # no atomic groups before python 3.11
+    convert = form.convert
+
+    def fast(stream: Stream, position: int) -> Parse[T]:
+        found = match(stream, position)
+        if found is None:
+            # let the combinators find exactly where it went wrong.
+            return parser(stream, position)
+        return convert(found.groups()), found.end()
+
+    return fast
+
+
+def parse_all(parser: Parser[T], stream: Stream) -> T:
+    """run `parser` over the whole of `stream`, which it has to consume."""
+    value, position = parser(stream, 0)
+    if position != len(stream):
+        raise ParseError("end of input", stream, position)
+    return value
+
+
+def parse_items(
+    parser: Parser[T], stream: Stream, stop: int
+) -> Generator[T, None, int]:
+    """
+    yields items parsed from the start of `stream` until they reach `stop`,
+    then returns the position the last of them ended at.
+    """
+    position = 0
+    while position < stop:
+        value, end = parser(stream, position)
+        if end == position:
+            raise ParseError("an item that isn't empty", stream, position)
+        yield value
+        position = end
+    return position
+
+
+def parse_stream(
+    parser: Parser[T], chunks: Iterable[Stream], terminator: str | bytes
+) -> Iterator[T]:
+    """
+    run `parser` repeatedly over a stream that arrives in chunks, yielding each
+    value as soon as it's complete. only the unparsed tail of the stream is
+    kept, so memory is bounded by the largest item rather than the whole input.
+
+    every item but the last has to end with `terminator`, which can't appear
+    inside any of them (like the blank line between records). chunks are only
+    joined & parsed once a terminator has arrived, so each item is parsed just
+    once, and any failure to parse it is raised straight away.
+    """
+    empty = terminator[:0]
+    pieces: list[Any] = []
+    # the end of the stream so far, to find terminators split across chunks.
+    tail: Any = empty
+    for chunk in chunks:
+        pieces.append(chunk)
+        recent = tail + chunk
+        tail = recent[max(0, len(recent) - len(terminator) + 1) :]
+        if terminator not in recent:
+            continue
+
+        pending = empty.join(pieces)
+        stop = pending.rfind(terminator) + len(terminator)
+        position = yield from parse_items(parser, pending, stop)
+        pieces = [pending[position:]]
+
+    pending = empty.join(pieces)
+    yield from parse_items(parser, pending, len(pending))
+
+
+def exact(expected: str | bytes) -> Parser[str | bytes]:
+    size = len(expected)
+
+    def parser(stream: Stream, position: int) -> Parse[str | bytes]:
+        if stream[position : position + size] != expected:
+            raise ParseError(expected, stream, position)
+        return expected, position + size
+
+    escaped = literal(expected)
+    return with_regular(parser, Regular(escaped, escaped, 0, lambda _: expected))
+
+
+def take_while(predicate: Callable[[str | bytes], bool]) -> Parser[str | bytes]:
+    def parser(stream: Stream, position: int) -> Parse[str | bytes]:
+        end = position
+        while end < len(stream) and predicate(piece(stream, end, end + 1)):
+            end += 1
+        return piece(stream, position, end), end
 
     return parser
 
 
 def integer() -> Parser[int]:
-    def parser(stream: str) -> Parse[int]:
-        digits, stream = take_while(lambda x: x in string.digits)(stream)
-        return int(digits), stream
+    digits = matcher(r"\d+")
 
-    return parser
+    def parser(stream: Stream, position: int) -> Parse[int]:
+        match = digits(stream, position)
+        if match is None:
+            raise ParseError("integer", stream, position)
+        return int(match.group()), match.end()
+
+    bare = atomic(r"\d+")
+    return with_regular(parser, Regular(f"({bare})", bare, 1, lambda g: int(g[0])))
 
 
 def whitespace(size: int) -> Parser[str]:
-    def parser(stream: str) -> Parse[str]:
-        space = stream[:size]
-        if len(space) != size or any(c not in string.whitespace for c in space):
-            raise ParseError(" " * size, stream)
-        return space, stream[size:]
+    regex = rf"\s{{{size}}}"
+    space = matcher(regex)
 
-    return parser
+    def parser(stream: Stream, position: int) -> Parse[str]:
+        match = space(stream, position)
+        if match is None:
+            raise ParseError(" " * size, stream, position)
+        return match.group(), match.end()
 
+    return with_regular(parser, Regular(f"({regex})", regex, 1, lambda g: g[0]))
 
-def separated(item_parser: Parser[T], separator: str) -> Parser[list[T]]:
+
+def separated(item_parser: Parser[T], separator: str | bytes) -> Parser[list[T]]:
     sep = exact(separator)
+    size = len(separator)
 
-    def parser(stream: str) -> Parse[list[T]]:
+    def repeat(item: Parser[T], stream: Stream, position: int) -> Parse[list[T]]:
         items = []
         while True:
-            item, stream = item_parser(stream)
-            items.append(item)
-            if not stream.startswith(separator):
+            value, position = item(stream, position)
+            items.append(value)
+            if stream[position : position + size] != separator:
                 break
-            _, stream = sep(stream)
-        return items, stream
+            _, position = sep(stream, position)
+        return items, position
 
-    return parser
+    def parser(stream: Stream, position: int) -> Parse[list[T]]:
+        return repeat(item_parser, stream, position)
+
+    item_form = regular(item_parser)
+    if item_form is None:
+        return parser
+
+    # a regex can't capture a group once per item, so match the whole run and
+    # then split it back up, one regex match per item.
+    fast_item = compiled(item_parser)
+    escaped = literal(separator)
+    repeated = f"(?:{item_form.bare})(?:{escaped}(?:{item_form.bare}))*"
+    bare = f"{atomic(repeated)}(?!{escaped})"
+
+    def convert(groups: Sequence[Any]) -> list[T]:
+        items, _ = repeat(fast_item, groups[0], 0)
+        return items
+
+    return with_regular(parser, Regular(f"({bare})", bare, 1, convert))
+
+
+def integers(
+    separator: str | bytes, *, compact: bool = False
+) -> Parser[list[int] | array]:
+    """
+    the same as `separated(integer(), separator)`, but the whole list is found
+    with one regex match and converted in bulk, rather than an item at a time.
+    with `compact`, the numbers are returned as an `array('q')` instead of a
+    list, which takes a fraction of the memory for long lists.
+    """
+    escaped = literal(separator)
+    # a separator right after the run means a number is missing; not matching
+    # at all makes compiled parsers fall back to `parser` to report it.
+    numbers = rf"\d+(?:{escaped}\d+)*"
+    bare = rf"{atomic(numbers)}(?!{escaped})"
+    run = matcher(numbers)
+    size = len(separator)
+
+    def convert(groups: Sequence[Any]) -> list[int] | array:
+        values = map(int, groups[0].split(separator))
+        return array("q", values) if compact else list(values)
+
+    def parser(stream: Stream, position: int) -> Parse[list[int] | array]:
+        match = run(stream, position)
+        if match is None:
+            raise ParseError("integer", stream, position)
+        end = match.end()
+        if stream[end : end + size] == separator:
+            # a separator that isn't followed by another number.
+            raise ParseError("integer", stream, end + size)
+        return convert((match.group(),)), end
+
+    return with_regular(parser, Regular(f"({bare})", bare, 1, convert))
+
+
+def sequence(*parsers: Parser[Any]) -> Parser[tuple[Any, ...]]:
+    """parse each of `parsers` in turn, returning all of their values."""
+
+    def parser(stream: Stream, position: int) -> Parse[tuple[Any, ...]]:
+        values = []
+        for item in parsers:
+            value, position = item(stream, position)
+            values.append(value)
+        return tuple(values), position
+
+    forms = [regular(item) for item in parsers]
+    if any(form is None for form in forms):
+        return parser
+
+    # parsers without groups always give the same value (like `exact`), so only
+    # the others need converting each time.
+    constants = []
+    spans = []
+    start = 0
+    for index, form in enumerate(forms):
+        if form.groups:
+            constants.append(None)
+            spans.append((index, form.convert, start, start + form.groups))
+        else:
+            constants.append(form.convert(()))
+        start += form.groups
+
+    def convert(groups: Sequence[Any]) -> tuple[Any, ...]:
+        values = constants.copy()
+        for index, item, start, end in spans:
+            values[index] = item(groups[start:end])
+        return tuple(values)
+
+    return with_regular(
+        parser,
+        Regular(
+            "".join(form.pattern for form in forms),
+            "".join(form.bare for form in forms),
+            start,
+            convert,
+        ),
+    )
 
 
 def delimited(before: Parser[str], inner: Parser[T], after: Parser[str]) -> Parser[T]:
-    def parser(stream: str) -> Parse[T]:
-        _, stream = before(stream)
-        value, stream = inner(stream)
-        _, stream = after(stream)
-        return value, stream
+    def parser(stream: Stream, position: int) -> Parse[T]:
+        _, position = before(stream, position)
+        value, position = inner(stream, position)
+        _, position = after(stream, position)
+        return value, position
 
-    return parser
+    forms = [regular(before), regular(inner), regular(after)]
+    if any(form is None for form in forms):
+        return parser
 
+    before_form, inner_form, after_form = forms
+    start = before_form.groups
+    end = start + inner_form.groups
 
-def one_of(chars: str) -> Parser[str]:
-    def parser(stream: str) -> Parse[str]:
-        char = stream[0]
-        if char not in chars:
-            raise ParseError(chars, stream)
-        return char, stream[1:]
+    def sliced(groups: Sequence[Any]) -> T:
+        return inner_form.convert(groups[start:end])
 
-    return parser
+    # most of the time only the inner parser has groups, so there's no need to
+    # slice them out.
+    convert = sliced if start or after_form.groups else inner_form.convert
+    return with_regular(
+        parser,
+        Regular(
+            "".join(form.pattern for form in forms),
+            "".join(form.bare for form in forms),
+            end + after_form.groups,
+            convert,
+        ),
+    )
+
+
+def mapped(inner: Parser[T], func: Callable[[T], U]) -> Parser[U]:
+    """parse with `inner`, then pass its value through `func`."""
+
+    def parser(stream: Stream, position: int) -> Parse[U]:
+        value, position = inner(stream, position)
+        return func(value), position
+
+    form = regular(inner)
+    if form is None:
+        return parser
+    return with_regular(
+        parser,
+        Regular(form.pattern, form.bare, form.groups, lambda g: func(form.convert(g))),
+    )
+
+
+def alternative(*parsers: Parser[Any]) -> Parser[Any]:
+    """parse with the first of `parsers` that succeeds."""
+
+    def parser(stream: Stream, position: int) -> Parse[Any]:
+        for option in parsers:
+            try:
+                return option(stream, position)
+            except ParseError:
+                pass
+        raise ParseError(f"one of {len(parsers)} alternatives", stream, position)
+
+    forms = [regular(option) for option in parsers]
+    if any(form is None for form in forms):
+        return parser
+
+    # each option gets an extra group around it, to tell which one matched.
+    spans = []
+    start = 0
+    for form in forms:
+        spans.append((form.convert, start, start + 1 + form.groups))
+        start += 1 + form.groups
+
+    def convert(groups: Sequence[Any]) -> Any:
+        for option, start, end in spans:
+            if groups[start] is not None:
+                return option(groups[start + 1 : end])
+        raise AssertionError("no alternative matched")
+
+    return with_regular(
+        parser,
+        Regular(
+            atomic("|".join(f"({form.pattern})" for form in forms)),
+            atomic("|".join(form.bare for form in forms)),
+            start,
+            convert,
+        ),
+    )
+
+
+def optional(inner: Parser[T]) -> Parser[T | None]:
+    """parse with `inner` if possible, giving `None` if it doesn't match."""
+
+    def parser(stream: Stream, position: int) -> Parse[T | None]:
+        try:
+            return inner(stream, position)
+        except ParseError:
+            return None, position
+
+    form = regular(inner)
+    if form is None:
+        return parser
+
+    def convert(groups: Sequence[Any]) -> T | None:
+        return None if groups[0] is None else form.convert(groups[1:])
+
+    return with_regular(
+        parser,
+        Regular(
+            atomic(f"({form.pattern})?"),
+            atomic(f"(?:{form.bare})?"),
+            1 + form.groups,
+            convert,
+        ),
+    )
+
+
+def one_of(chars: str | bytes) -> Parser[str | bytes]:
+    def parser(stream: Stream, position: int) -> Parse[str | bytes]:
+        char = piece(stream, position, position + 1)
+        if not char or char not in chars:
+            raise ParseError(chars, stream, position)
+        return char, position + 1
+
+    regex = f"[{literal(chars)}]"
+    return with_regular(parser, Regular(f"({regex})", regex, 1, lambda g: g[0]))
+
+
+def outcome(parser: Parser[T], stream: Stream) -> tuple[Any, ...]:
+    """what `parser` makes of `stream`: its value & end, or where it failed."""
+    try:
+        return parser(stream, 0)
+    except ParseError as error:
+        return ("error", error.position)
+
+
+def disagreements(
+    parser: Parser[Any], streams: Iterable[Stream]
+) -> Iterator[tuple[Stream, tuple[Any, ...], tuple[Any, ...]]]:
+    """
+    yields each stream that `parser` & `compiled(parser)` parse differently,
+    with what the combinators & the regex made of it.
+    """
+    fast = compiled(parser)
+    for stream in streams:
+        slow_outcome = outcome(parser, stream)
+        fast_outcome = outcome(fast, stream)
+        if slow_outcome != fast_outcome:
+            yield stream, slow_outcome, fast_outcome
+
+
+def stream_disagreements(
+    parser: Parser[Any],
+    streams: Iterable[Stream],
+    terminator: str | bytes,
+    rng: random.Random,
+) -> Iterator[tuple[Stream, Any, Any]]:
+    """
+    yields each stream of `terminator`-ended items that `parse_stream` parses
+    differently when it arrives in random chunks than when parsed all at once,
+    with both results. failures only have to agree that there was one, since
+    positions are counted from the start of the chunks still pending.
+    """
+
+    def collect(items: Iterable[Any]) -> Any:
+        try:
+            return list(items)
+        except ParseError:
+            return "error"
+
+    for stream in streams:
+        count = max(0, min(len(stream) - 1, 4))
+        cuts = sorted(rng.sample(range(1, len(stream)), count))
+        chunks = [
+            stream[start:stop]
+            for start, stop in itertools.pairwise([0, *cuts, len(stream)])
+        ]
+        whole = collect(parse_items(parser, stream, len(stream)))
+        streamed = collect(parse_stream(parser, chunks, terminator))
+        if whole != streamed:
+            yield stream, whole, streamed
+
+
+def random_grammar(rng: random.Random, depth: int, *, text: bool) -> Parser[Any]:
+    """
+    a random tree of combinators, `depth` levels deep at most, for parsing
+    either text or bytes.
+    """
+
+    def lit(value: str) -> str | bytes:
+        return value if text else value.encode()
+
+    leaves = [
+        lambda: exact(lit("a")),
+        lambda: exact(lit("ab")),
+        lambda: exact(lit(",")),
+        integer,
+        lambda: integers(lit(",")),
+        lambda: one_of(lit("ab")),
+        lambda: whitespace(1),
+    ]
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(leaves)()
+
+    def child() -> Parser[Any]:
+        return random_grammar(rng, depth - 1, text=text)
+
+    nodes = [
+        lambda: sequence(*(child() for _ in range(rng.randint(2, 3)))),
+        lambda: alternative(*(child() for _ in range(rng.randint(2, 3)))),
+        lambda: optional(child()),
+        lambda: separated(child(), lit(",")),
+        lambda: delimited(exact(lit("a")), child(), exact(lit(" "))),
+        lambda: mapped(child(), repr),
+    ]
+    return rng.choice(nodes)()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="check that compiled parsers agree with the combinators."
+    )
+    parser.add_argument("--grammars", type=int, default=1000)
+    parser.add_argument("--inputs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for _ in range(args.grammars):
+        # bytes grammars are run over memoryviews, the most awkward of streams.
+        text = rng.random() < 0.5
+        grammar = random_grammar(rng, depth=3, text=text)
+        streams = [
+            "".join(rng.choices("ab12, ", k=rng.randint(0, 8)))
+            for _ in range(args.inputs)
+        ]
+        # the same strings as ";"-ended items, to parse in chunks.
+        records = [
+            ";".join(rng.sample(streams, rng.randint(1, 4))) + rng.choice(["", ";"])
+            for _ in range(args.inputs)
+        ]
+        if not text:
+            streams = [memoryview(stream.encode()) for stream in streams]
+            records = [memoryview(record.encode()) for record in records]
+
+        # one disagreement is enough to show a grammar is wrong.
+        for stream, slow, fast in disagreements(grammar, streams):
+            failures += 1
+            stream = piece(stream, 0, len(stream))
+            print(f"{stream!r}: combinators gave {slow}, regex gave {fast}")
+            break
+
+        end = ";" if text else b";"
+        record = compiled(sequence(grammar, optional(exact(end))))
+        for stream, whole, streamed in stream_disagreements(record, records, end, rng):
+            failures += 1
+            stream = piece(stream, 0, len(stream))
+            print(f"{stream!r}: parsed whole gave {whole}, in chunks gave {streamed}")
+            break
+
+    print(f"{failures} of {args.grammars} grammars disagreed")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
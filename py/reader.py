@@ -0,0 +1,100 @@
+"""
+a shared reader for puzzle inputs.
+
+inputs are memory-mapped rather than read into memory, so even huge files cost
+nothing until they're used, and only the parts being worked on stay resident.
+the helpers here walk the mapped bytes directly; decoding to text is left to
+the days that need it.
+"""
+import codecs
+import mmap
+from contextlib import contextmanager
+from typing import Iterator
+
+# anything the helpers below can read from. files are given as an mmap, but
+# plain bytes work just as well for inputs that are already in memory.
+Buffer = bytes | mmap.mmap
+
+CHUNK_SIZE = 64 * 1024
+
+
+@contextmanager
+def open_input(path: str) -> Iterator[Buffer]:
+    """memory-map the input file at `path` for reading."""
+    with open(path, "rb") as input_file:
+        try:
+            mapped = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped, but there's nothing to map anyway.
+            yield b""
+            return
+
+        with mapped:
+            yield mapped
+
+
+def lines(buffer: Buffer) -> Iterator[bytes]:
+    """
+    yields each line of the buffer as bytes, without its line ending.
+    a newline at the very end of the buffer doesn't count as an extra line.
+    """
+    find = buffer.find
+    start = 0
+    end = len(buffer)
+    while start < end:
+        stop = find(b"\n", start)
+        if stop == -1:
+            stop = end
+        line = buffer[start:stop]
+        yield line[:-1] if line.endswith(b"\r") else line
+        start = stop + 1
+
+
+def blocks(buffer: Buffer, separator: bytes = b"\n\n") -> Iterator[bytes]:
+    """
+    yields the blocks of the buffer between each `separator`, which is a blank
+    line by default, with surrounding whitespace removed. empty blocks, like
+    the one after a trailing separator, are skipped.
+    """
+    find = buffer.find
+    start = 0
+    end = len(buffer)
+    while start < end:
+        stop = find(separator, start)
+        if stop == -1:
+            stop = end
+        if block := buffer[start:stop].strip():
+            yield block
+        start = stop + len(separator)
+
+
+def text_lines(buffer: Buffer, encoding: str = "utf-8") -> Iterator[str]:
+    """yields each line of the buffer decoded to text."""
+    for line in lines(buffer):
+        yield line.decode(encoding)
+
+
+def text(buffer: Buffer, encoding: str = "utf-8") -> str:
+    """decode the whole buffer at once, for parsers that need it all as text."""
+    return buffer[:].decode(encoding)
+
+
+def chunks(buffer: Buffer, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """yields the buffer in pieces of at most `size` bytes."""
+    for start in range(0, len(buffer), size):
+        yield buffer[start : start + size]
+
+
+def text_chunks(
+    buffer: Buffer, size: int = CHUNK_SIZE, encoding: str = "utf-8"
+) -> Iterator[str]:
+    """
+    yields the buffer decoded to text a piece at a time. characters split
+    across pieces are held back until the rest of them arrives.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks(buffer, size):
+        if piece := decoder.decode(chunk):
+            yield piece
+    if rest := decoder.decode(b"", final=True):
+        yield rest
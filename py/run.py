@@ -0,0 +1,664 @@
+"""
+runs the solutions as libraries and reports how long each phase takes.
+
+every day module exposes `parse(data)`, `part1(parsed)` and `part2(parsed)`, so
+we can time them separately without any of the side effects of running the
+scripts directly. run it from the root of the project like so:
+
+$ python py/run.py --day 11 --repeat 20
+"""
+import argparse
+import cProfile
+import importlib
+import json
+import math
+import os
+import pstats
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Callable
+
+from cache import DEFAULT_MAX_BYTES, ParseCache
+from reader import Buffer, open_input
+
+DAYS = list(range(1, 17))
+PARTS = ("part1", "part2")
+PHASES = ("parse", *PARTS)
+
+DEFAULT_HISTORY = ".cache/timings.json"
+
+
+@dataclass(frozen=True)
+class Sample:
+    """wall clock & cpu time taken by a single call, in seconds."""
+
+    wall: float
+    cpu: float
+
+
+@dataclass(frozen=True)
+class Summary:
+    """min, median & 95th percentile of a set of timings, in seconds."""
+
+    minimum: float
+    median: float
+    p95: float
+
+    @staticmethod
+    def of(values: list[float]) -> "Summary":
+        ordered = sorted(values)
+        # nearest-rank percentile, so it's always one of the measured values.
+        rank = math.ceil(0.95 * len(ordered)) - 1
+        return Summary(
+            minimum=ordered[0],
+            median=statistics.median(ordered),
+            p95=ordered[rank],
+        )
+
+
+@dataclass
+class DayResult:
+    """the answers & timing samples gathered from running a single day."""
+
+    day: int
+    answers: dict[str, Any] = field(default_factory=dict)
+    samples: dict[str, list[Sample]] = field(
+        default_factory=lambda: {phase: [] for phase in PHASES}
+    )
+
+    def wall(self, phase: str) -> Summary:
+        return Summary.of([sample.wall for sample in self.samples[phase]])
+
+    def cpu(self, phase: str) -> Summary:
+        return Summary.of([sample.cpu for sample in self.samples[phase]])
+
+
+def timed(func: Callable[..., Any], *args: Any) -> tuple[Any, Sample]:
+    """call `func` with the given arguments and measure how long it took."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = func(*args)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return result, Sample(wall=wall, cpu=cpu)
+
+
+def load_day(day: int) -> ModuleType:
+    """import the solution for the given day as a library."""
+    return importlib.import_module(f"day{day}")
+
+
+def input_path(day: int, inputs_dir: str) -> str:
+    return os.path.join(inputs_dir, f"day{day}")
+
+
+def run_day(
+    day: int,
+    *,
+    repeat: int,
+    inputs_dir: str,
+    cache: ParseCache | None = None,
+    parts: tuple[str, ...] = PARTS,
+) -> DayResult:
+    """
+    parse & solve the given day `repeat` times, timing each phase separately.
+    parsing is repeated too, so each run starts from a fresh representation.
+
+    if a `cache` is given, parse results are loaded from it when possible, so
+    the parse phase measures loading the cached representation instead.
+    `parts` can be narrowed down to run only one of the puzzle's parts.
+    """
+    module = load_day(day)
+    result = DayResult(day=day)
+
+    def parse(data: Buffer) -> Any:
+        if cache is None:
+            return module.parse(data)
+        return cache.parse(module, data)
+
+    with open_input(input_path(day, inputs_dir)) as data:
+        for _ in range(repeat):
+            parsed, sample = timed(parse, data)
+            result.samples["parse"].append(sample)
+
+            for phase in parts:
+                answer, sample = timed(getattr(module, phase), parsed)
+                result.answers[phase] = answer
+                result.samples[phase].append(sample)
+
+    return result
+
+
+@dataclass(frozen=True)
+class MemoryUsage:
+    """
+    the peak memory allocated by a phase in bytes, and the lines of code that
+    allocated the most of it, as `file:line` & bytes.
+    """
+
+    peak: int
+    top_sites: list[tuple[str, int]]
+
+
+class PeakSnapshots:
+    """
+    a profile hook that snapshots the traced allocations whenever they grow
+    well past the last snapshot, so the final snapshot is taken close to the
+    peak. we can't snapshot at the exact peak, but this gets within `growth`.
+    """
+
+    # don't bother snapshotting for growth smaller than this.
+    MIN_STEP = 64 * 1024
+
+    def __init__(self, growth: float = 1.1):
+        self.growth = growth
+        self.start = tracemalloc.take_snapshot()
+        current, _ = tracemalloc.get_traced_memory()
+        self.threshold = current + self.MIN_STEP
+        self.latest: tracemalloc.Snapshot | None = None
+
+    def __call__(self, frame: Any, event: str, arg: Any) -> None:
+        if event != "return":
+            return
+        current, _ = tracemalloc.get_traced_memory()
+        if current > self.threshold:
+            self.latest = tracemalloc.take_snapshot()
+            self.threshold = max(current * self.growth, current + self.MIN_STEP)
+
+    def top_sites(self, count: int) -> list[tuple[str, int]]:
+        """the `count` lines that had allocated the most at the last snapshot."""
+        latest = self.latest or tracemalloc.take_snapshot()
+        latest = latest.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ]
+        )
+        stats = latest.compare_to(self.start, "lineno")
+        stats = sorted(
+            (stat for stat in stats if stat.size_diff > 0),
+            key=lambda stat: stat.size_diff,
+            reverse=True,
+        )
+        return [
+            (
+                f"{os.path.basename(stat.traceback[0].filename)}"
+                f":{stat.traceback[0].lineno}",
+                stat.size_diff,
+            )
+            for stat in stats[:count]
+        ]
+
+
+def measure_memory(
+    day: int, *, inputs_dir: str, top: int = 0
+) -> dict[str, MemoryUsage]:
+    """
+    parse & solve the given day once, measuring the peak memory allocated by
+    each phase. this is done separately from timing, since tracing allocations
+    slows everything down a lot.
+
+    each peak is measured relative to what was allocated when the phase began,
+    so the parts don't count the parsed input they were given. if `top` is
+    given, the lines responsible for the most memory near each phase's peak are
+    found too, which slows things down even more.
+    """
+    module = load_day(day)
+    usage = {}
+
+    with open_input(input_path(day, inputs_dir)) as data:
+        tracemalloc.start()
+        try:
+            parsed = None
+            for phase in PHASES:
+                snapshots = PeakSnapshots() if top else None
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+
+                sys.setprofile(snapshots)
+                try:
+                    if phase == "parse":
+                        parsed = module.parse(data)
+                    else:
+                        getattr(module, phase)(parsed)
+                finally:
+                    sys.setprofile(None)
+
+                _, peak = tracemalloc.get_traced_memory()
+                usage[phase] = MemoryUsage(
+                    peak=peak - before,
+                    top_sites=snapshots.top_sites(top) if snapshots else [],
+                )
+        finally:
+            tracemalloc.stop()
+
+    return usage
+
+
+def frame_label(func: tuple[str, int, str]) -> str:
+    """a short name for a function in profile stats, like `day12.py:108(bfs)`."""
+    filename, line, name = func
+    if filename == "~":
+        # builtins have no file, and their name already says what they are.
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> dict[str, int]:
+    """
+    convert profile stats into the collapsed stack format that flamegraph tools
+    read, mapping `root;caller;callee` to microseconds of self time.
+
+    cprofile only records caller/callee pairs rather than whole stacks, so each
+    function's time is shared between the paths into it in proportion to how
+    long each caller spent in it. recursive calls are folded into the first.
+    """
+    raw = stats.stats  # type: ignore[attr-defined]
+    callees: dict[Any, dict[Any, float]] = defaultdict(dict)
+    for func, (*_, callers) in raw.items():
+        for caller, (*_, cumulative) in callers.items():
+            callees[caller][func] = cumulative
+
+    stacks: dict[str, float] = defaultdict(float)
+
+    def walk(func: Any, path: tuple[Any, ...], share: float) -> None:
+        _, _, self_time, _, _ = raw[func]
+        path = (*path, func)
+        stacks[";".join(frame_label(frame) for frame in path)] += self_time * share
+
+        for callee, cumulative in callees[func].items():
+            callee_total = raw[callee][3]
+            # skip recursion, and paths too small to show up on a flamegraph.
+            if callee in path or not callee_total or cumulative * share < 1e-6:
+                continue
+            walk(callee, path, share * cumulative / callee_total)
+
+    for func, (*_, callers) in raw.items():
+        if not callers:
+            walk(func, (), 1.0)
+
+    return {
+        stack: round(seconds * 1e6)
+        for stack, seconds in stacks.items()
+        if round(seconds * 1e6) > 0
+    }
+
+
+def profile_day(day: int, *, inputs_dir: str, out_dir: str) -> None:
+    """
+    profile each phase of the given day separately, writing a `.pstats` file
+    and a `.collapsed` flamegraph stack file for each into `out_dir`.
+    """
+    module = load_day(day)
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f"day {day}")
+    with open_input(input_path(day, inputs_dir)) as data:
+        parsed = None
+        for phase in PHASES:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            if phase == "parse":
+                parsed = module.parse(data)
+            else:
+                getattr(module, phase)(parsed)
+            profiler.disable()
+
+            path = os.path.join(out_dir, f"day{day}-{phase}")
+            profiler.dump_stats(f"{path}.pstats")
+            stats = pstats.Stats(profiler)
+            with open(f"{path}.collapsed", "w", encoding="utf-8") as collapsed_file:
+                for stack, micros in sorted(collapsed_stacks(stats).items()):
+                    collapsed_file.write(f"{stack} {micros}\n")
+
+            # show where most of the time went, so there's no need to open the
+            # files just to get the gist.
+            raw = stats.stats  # type: ignore[attr-defined]
+            total = stats.total_tt  # type: ignore[attr-defined]
+            hottest = sorted(raw.items(), key=lambda item: item[1][2], reverse=True)
+            print(f"  {phase:<6} {format_seconds(total).strip()}")
+            for func, (_, calls, self_time, _, _) in hottest[:5]:
+                print(
+                    f"    {format_seconds(self_time)} {calls:>10} calls"
+                    f"  {frame_label(func)}"
+                )
+    print()
+
+
+@dataclass(frozen=True)
+class StartupTime:
+    """
+    how long it takes to start an interpreter & import a day, in seconds.
+    `imports` lists the modules that took longest to import, by their own time.
+    """
+
+    interpreter: float
+    total: float
+    imports: list[tuple[str, float]]
+
+
+def measure_startup(day: int, *, repeat: int, top: int = 5) -> StartupTime:
+    """
+    time a fresh interpreter importing the given day, against one that does
+    nothing. both are run `repeat` times and the fastest kept, since startup
+    only ever gets slower due to noise.
+    """
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(os.path.abspath(__file__))}
+
+    def fastest(*args: str) -> tuple[float, str]:
+        best = (math.inf, "")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            process = subprocess.run(
+                [sys.executable, *args],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            best = min(best, (time.perf_counter() - start, process.stderr))
+        return best
+
+    interpreter, startup_log = fastest("-X", "importtime", "-c", "pass")
+    total, import_log = fastest("-X", "importtime", "-c", f"import day{day}")
+
+    def parse_log(log: str) -> dict[str, float]:
+        # lines look like "import time:   self [us] | cumulative | module"
+        modules = {}
+        for line in log.splitlines()[1:]:
+            self_time, _, module = line.removeprefix("import time:").split("|")
+            modules[module.strip()] = int(self_time) / 1e6
+        return modules
+
+    # leave out whatever the interpreter imports for itself on startup.
+    already_imported = parse_log(startup_log)
+    imports = [
+        (module, self_time)
+        for module, self_time in parse_log(import_log).items()
+        if module not in already_imported
+    ]
+    imports.sort(key=lambda item: item[1], reverse=True)
+
+    return StartupTime(interpreter=interpreter, total=total, imports=imports[:top])
+
+
+def report_startup(day: int, startup: StartupTime) -> None:
+    print(f"day {day}")
+    print(f"  interpreter {format_seconds(startup.interpreter)}")
+    print(f"  imports     {format_seconds(startup.total - startup.interpreter)}")
+    for module, self_time in startup.imports:
+        print(f"    {format_seconds(self_time)}  {module}")
+    print()
+
+
+def merge(results: list[DayResult]) -> DayResult:
+    """combine the answers & samples of several runs of the same day."""
+    merged = DayResult(day=results[0].day)
+    for result in results:
+        merged.answers.update(result.answers)
+        for phase, samples in result.samples.items():
+            merged.samples[phase].extend(samples)
+    merged.answers = {part: merged.answers[part] for part in PARTS}
+    return merged
+
+
+def load_history(path: str) -> dict[str, dict[str, float]]:
+    """load the wall time each part took the last time it ran in a batch."""
+    try:
+        with open(path, encoding="utf-8") as history_file:
+            return json.load(history_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_history(path: str, history: dict[str, dict[str, float]]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as history_file:
+        json.dump(history, history_file, indent=2, sort_keys=True)
+
+
+def run_batch(
+    days: list[int],
+    *,
+    repeat: int,
+    inputs_dir: str,
+    cache: ParseCache | None,
+    jobs: int,
+    history_path: str,
+) -> list[DayResult]:
+    """
+    run every part of every day on a pool of `jobs` worker processes.
+
+    each part is its own job, which parses the input for itself. jobs are
+    submitted longest first according to how long they took last time, so the
+    slowest ones don't end up starting last. parts we have no history for are
+    assumed to be slow.
+    """
+    history = load_history(history_path)
+
+    def estimate(job: tuple[int, str]) -> float:
+        day, part = job
+        return history.get(str(day), {}).get(part, math.inf)
+
+    pending = sorted(
+        ((day, part) for day in days for part in PARTS), key=estimate, reverse=True
+    )
+
+    by_day: dict[int, list[DayResult]] = {day: [] for day in days}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(
+                run_day,
+                day,
+                repeat=repeat,
+                inputs_dir=inputs_dir,
+                cache=cache,
+                parts=(part,),
+            ): (day, part)
+            for day, part in pending
+        }
+        for future in as_completed(futures):
+            day, part = futures[future]
+            result = future.result()
+            by_day[day].append(result)
+
+            total = result.wall("parse").median + result.wall(part).median
+            history.setdefault(str(day), {})[part] = total
+
+    save_history(history_path, history)
+    return [merge(by_day[day]) for day in days]
+
+
+def format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:10.3f}ms"
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:7.1f}{unit:>3}"
+        size /= 1024
+    return f"{size:7.1f}GiB"
+
+
+def report_memory(day: int, usage: dict[str, MemoryUsage]) -> None:
+    """print the peak memory of each phase & where it was allocated."""
+    print(f"day {day}")
+    for phase, phase_usage in usage.items():
+        print(f"  {phase:<6} peak {format_bytes(phase_usage.peak)}")
+        for site, size in phase_usage.top_sites:
+            print(f"    {format_bytes(size)}  {site}")
+    print()
+
+
+def report(result: DayResult) -> None:
+    """print the answers & a table of timings for a single day."""
+    print(f"day {result.day}")
+    for phase, answer in result.answers.items():
+        print(f"  {phase}: {answer}")
+
+    print(
+        f"  {'phase':<6}"
+        f"{'wall min':>12}{'median':>12}{'p95':>12}"
+        f"{'cpu min':>12}{'median':>12}{'p95':>12}"
+    )
+    for phase in PHASES:
+        wall = result.wall(phase)
+        cpu = result.cpu(phase)
+        timings = [
+            wall.minimum,
+            wall.median,
+            wall.p95,
+            cpu.minimum,
+            cpu.median,
+            cpu.p95,
+        ]
+        print(f"  {phase:<6}" + "".join(format_seconds(t) for t in timings))
+    print()
+
+
+def positive(value: str) -> int:
+    """an argparse type for counts that have to be at least one."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def non_negative(value: str) -> int:
+    """an argparse type for counts where 0 means something (like "one per cpu")."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, not {number}")
+    return number
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--day",
+        type=int,
+        action="append",
+        choices=DAYS,
+        help="day to run. can be given more than once. defaults to every day "
+        "with an input file.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=positive,
+        default=1,
+        help="number of times to run each phase.",
+    )
+    parser.add_argument(
+        "--inputs",
+        default="inputs",
+        help="directory containing the puzzle inputs.",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        help="cache parsed inputs in this directory, and load them from it.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        metavar="MB",
+        help="size limit of the parse cache, in megabytes.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=non_negative,
+        default=1,
+        help="run every part on a pool of this many processes. "
+        "0 uses one per cpu.",
+    )
+    parser.add_argument(
+        "--history",
+        default=DEFAULT_HISTORY,
+        metavar="FILE",
+        help="where to keep the timings used to schedule jobs on the pool.",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="measure peak memory & where it's allocated instead of timings.",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="profile each phase instead of timing it, writing .pstats & "
+        ".collapsed flamegraph stacks into this directory.",
+    )
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="measure interpreter startup & import time for each day instead.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="number of allocation sites or imports to show with --memory or "
+        "--startup.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    days = args.day or [
+        day for day in DAYS if os.path.exists(input_path(day, args.inputs))
+    ]
+    if args.startup:
+        for day in days:
+            report_startup(day, measure_startup(day, repeat=args.repeat, top=args.top))
+        return
+
+    if args.profile:
+        for day in days:
+            profile_day(day, inputs_dir=args.inputs, out_dir=args.profile)
+        return
+
+    if args.memory:
+        for day in days:
+            usage = measure_memory(day, inputs_dir=args.inputs, top=args.top)
+            report_memory(day, usage)
+        return
+
+    cache = None
+    if args.cache:
+        cache = ParseCache(args.cache, max_bytes=args.cache_size * 1024 * 1024)
+
+    if args.jobs == 1:
+        for day in days:
+            report(
+                run_day(day, repeat=args.repeat, inputs_dir=args.inputs, cache=cache)
+            )
+        return
+
+    start = time.perf_counter()
+    results = run_batch(
+        days,
+        repeat=args.repeat,
+        inputs_dir=args.inputs,
+        cache=cache,
+        jobs=args.jobs or os.cpu_count() or 1,
+        history_path=args.history,
+    )
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        report(result)
+    print(f"ran {len(results) * len(PARTS)} jobs in {format_seconds(elapsed).strip()}")
+
+
+if __name__ == "__main__":
+    main()